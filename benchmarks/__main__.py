@@ -0,0 +1,81 @@
+"""
+Minimal runner for the asv benchmark classes when asv is not available:
+
+    python -m benchmarks [filter]
+"""
+
+import importlib
+import inspect
+import itertools
+import os
+import pkgutil
+import subprocess
+import sys
+import time
+
+import benchmarks
+
+def cases(cls):
+    params = getattr(cls, 'params', [])
+    if len(params) == 0:
+        return [()]
+    if not isinstance(params, tuple):
+        params = (params,)
+    return list(itertools.product(*params))
+
+TIMERAW = """
+import time
+t0 = time.perf_counter()
+exec(compile(%r, '<timeraw>', 'exec'))
+print(time.perf_counter() - t0)
+"""
+
+def timeraw(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    out = subprocess.run([sys.executable, '-c', TIMERAW % code], env=env, check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return float(out.split()[-1])
+
+def run(cls, name, args):
+    bench = cls()
+    method = getattr(bench, name)
+    if name.startswith('timeraw_'):
+        repeat = getattr(cls, 'repeat', 5)
+        samples = sorted(timeraw(method(*args)) for _ in range(repeat if isinstance(repeat, int) else 5))
+        return samples[len(samples) // 2]
+    setup = getattr(method, 'setup', getattr(cls, 'setup', None))
+    teardown = getattr(cls, 'teardown', None)
+    repeat = getattr(cls, 'repeat', 5)
+    if not isinstance(repeat, int):
+        repeat = 5
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup(bench, *args)
+        t0 = time.perf_counter()
+        value = method(*args)
+        elapsed = time.perf_counter() - t0
+        if teardown is not None:
+            teardown(bench, *args)
+        samples.append(value if name.startswith('track_') else elapsed)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def main(pattern=''):
+    for info in pkgutil.iter_modules(benchmarks.__path__):
+        if not info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.%s' % info.name)
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for name in sorted(dir(cls)):
+                if not name.startswith(('time_', 'timeraw_', 'track_')):
+                    continue
+                for args in cases(cls):
+                    label = '%s.%s.%s%s' % (info.name, cls_name, name, list(args) if args else '')
+                    if pattern in label:
+                        print('%-70s %.6g' % (label, run(cls, name, args)), flush=True)
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,39 @@
+import time
+
+from quantica.bitset import QBitNet
+
+from . import nets
+from .bench_step import STEPS, run
+
+class BitStepping:
+    params = (['qnet', 'bitset'], ['chain', 'forkjoin'])
+    param_names = ['engine', 'net']
+
+    def setup(self, engine, kind):
+        self.net = nets.chain(100) if kind == 'chain' else nets.forkjoin(20)
+        if engine == 'bitset':
+            self.net = QBitNet(self.net)
+
+    def time_steps(self, engine, kind):
+        run(self.net)
+
+    def track_steps_per_second(self, engine, kind):
+        t0 = time.perf_counter()
+        run(self.net)
+        return STEPS / (time.perf_counter() - t0)
+    track_steps_per_second.unit = 'steps/s'
+
+class BitReachability:
+    params = [8, 12, 16]
+    param_names = ['width']
+    timeout = 120
+
+    def setup(self, width):
+        self.net = QBitNet(nets.forkjoin(width))
+
+    def time_reachable(self, width):
+        self.net.reachable()
+
+    def track_markings(self, width):
+        return len(self.net.reachable())
+    track_markings.unit = 'markings'
@@ -0,0 +1,51 @@
+import tracemalloc
+
+from quantica.core import QNet
+
+from . import nets
+
+class Construction:
+    params = [10, 100, 500]
+    param_names = ['size']
+
+    def time_chain(self, size):
+        nets.chain(size)
+
+    def time_chain_unbatched(self, size):
+        net = QNet('Chain', logging_level=nets.LOGGING_LEVEL)
+        places = [net.createPlace('P%d' % i) for i in range(size)]
+        for i in range(size):
+            t = net.createTransition('T%d' % i)
+            net.connect(places[i], t, 1)
+            net.connect(t, places[(i + 1) % size], 1)
+
+    def time_forkjoin(self, size):
+        nets.forkjoin(size)
+
+    def time_dense(self, size):
+        nets.dense(size, size)
+
+    def peakmem_chain(self, size):
+        nets.chain(size)
+
+    def track_bytes_per_node(self, size):
+        tracemalloc.start()
+        net = nets.chain(size)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current / (net.nplaces + net.ntransitions)
+    track_bytes_per_node.unit = 'bytes'
+
+class Composition:
+    params = ([1, 2, 3], [2, 4])
+    param_names = ['depth', 'width']
+
+    def time_nested(self, depth, width):
+        nets.nested(depth, width, 10)
+
+    def setup_flatten(self, depth, width):
+        self.net = nets.nested(depth, width, 10)
+
+    def time_flatten(self, depth, width):
+        self.net.flatten()
+    time_flatten.setup = setup_flatten
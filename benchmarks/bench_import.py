@@ -0,0 +1,14 @@
+class Import:
+    repeat = 10
+
+    def timeraw_import_core(self):
+        return "import quantica.core"
+
+    def timeraw_import_discretelogic(self):
+        return "import quantica.discretelogic"
+
+    def timeraw_build_and_evaluate(self):
+        return """
+from quantica.discretelogic import QNAND
+QNAND().set(True, True)
+"""
@@ -0,0 +1,36 @@
+import time
+
+from quantica.core import QNet
+
+from . import nets
+
+EVENTS = 10000
+
+class Ingestion:
+    params = ['produce', 'ingest']
+    param_names = ['api']
+
+    def setup(self, api):
+        self.net = QNet('Ingestion', logging_level=nets.LOGGING_LEVEL)
+        self.places = [self.net.createPlace('S%d' % i) for i in range(10)]
+        self.sink = self.net.createPlace('Sink')
+        for i, place in enumerate(self.places):
+            t = self.net.createTransition('T%d' % i)
+            self.net.connect(place, t, 1)
+            self.net.connect(t, self.sink, 1)
+        self.net.setBulkFiring()
+        self.events = [(self.places[i % len(self.places)], 1) for i in range(EVENTS)]
+
+    def time_absorb_events(self, api):
+        if api == 'produce':
+            for p_uri, count in self.events:
+                self.net.produce(p_uri, count)
+        else:
+            self.net.ingest(self.events)
+        self.net.next_until_end()
+
+    def track_events_per_second(self, api):
+        t0 = time.perf_counter()
+        self.time_absorb_events(api)
+        return EVENTS / (time.perf_counter() - t0)
+    track_events_per_second.unit = 'events/s'
@@ -0,0 +1,27 @@
+from . import nets
+
+from quantica.core import QNet
+
+def lanes(width, tokens, label='Lanes'):
+    net = QNet(label, logging_level=nets.LOGGING_LEVEL)
+    with net.batch():
+        for i in range(width):
+            p_in = net.createPlace('In%d' % i, init_tokens=tokens)
+            p_out = net.createPlace('Out%d' % i)
+            t = net.createTransition('T%d' % i)
+            net.connect(p_in, t, 1)
+            net.connect(t, p_out, 1)
+    return net
+
+class ParallelFiring:
+    # Firing holds the GIL, so more workers are not expected to be faster on
+    # local places: this tracks the overhead of the pool against workers=1.
+    params = ([1, 4], [False, True])
+    param_names = ['workers', 'bulk']
+
+    def setup(self, workers, bulk):
+        self.net = lanes(32, 50)
+        self.net.setBulkFiring(bulk)
+
+    def time_start_async(self, workers, bulk):
+        self.net.start_async(workers=workers)
@@ -0,0 +1,47 @@
+import socket
+import time
+
+from quantica.core import QNet, QNetRemote
+
+from . import nets
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+class RemoteCalls:
+    repeat = 20
+
+    def setup(self):
+        address = ('localhost', free_port())
+        self.served = nets.chain(10, label='Served')
+        self.server = QNet('Server', address=address, logging_level=nets.LOGGING_LEVEL)
+        self.server.addNet(self.served)
+        self.remote = QNetRemote(address)
+        for _ in range(100):
+            try:
+                self.remote.getLabel()
+                break
+            except OSError:
+                time.sleep(0.01)
+
+    def teardown(self):
+        self.server.__rpcshutdown__()
+
+    def time_get_tokens(self):
+        self.remote.getTokens('P0.Served')
+
+    def time_state(self):
+        self.remote.state()
+
+    def time_produce_100_events(self):
+        for _ in range(100):
+            self.remote.produce('P0.Served', 1)
+
+    def time_ingest_100_events(self):
+        self.remote.ingest([('P0.Served', 1)] * 100)
+
+    def time_compose_remote(self):
+        net = QNet('Client', logging_level=nets.LOGGING_LEVEL)
+        net.addNet(self.remote)
@@ -0,0 +1,21 @@
+from quantica import siphons
+
+from . import nets
+
+class Siphons:
+    params = (['chain', 'forkjoin'], [100, 300])
+    param_names = ['net', 'size']
+    timeout = 120
+
+    def setup(self, kind, size):
+        self.net = nets.chain(size) if kind == 'chain' else nets.forkjoin(size)
+
+    def time_minimal_siphons(self, kind, size):
+        self.net.getSiphons()
+
+    def time_deadlock_free(self, kind, size):
+        siphons.isDeadlockFree(self.net)
+
+    def track_siphons(self, kind, size):
+        return len(self.net.getSiphons())
+    track_siphons.unit = 'siphons'
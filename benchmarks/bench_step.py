@@ -0,0 +1,37 @@
+import time
+
+from . import nets
+
+STEPS = 200
+
+def run(net, steps=STEPS):
+    for _, _ in zip(range(steps), net):
+        pass
+
+def steps_per_second(net, steps=STEPS):
+    t0 = time.perf_counter()
+    run(net, steps)
+    return steps / (time.perf_counter() - t0)
+
+class Stepping:
+    params = (['chain', 'forkjoin', 'dense', 'nested', 'flattened'], [10, 100])
+    param_names = ['net', 'size']
+
+    def setup(self, kind, size):
+        if kind == 'chain':
+            self.net = nets.chain(size)
+        elif kind == 'forkjoin':
+            self.net = nets.forkjoin(size)
+        elif kind == 'dense':
+            self.net = nets.dense(size, size)
+        elif kind == 'nested':
+            self.net = nets.nested(2, 2, size // 4)
+        else:
+            self.net = nets.nested(2, 2, size // 4).flatten()
+
+    def time_steps(self, kind, size):
+        run(self.net)
+
+    def track_steps_per_second(self, kind, size):
+        return steps_per_second(self.net)
+    track_steps_per_second.unit = 'steps/s'
@@ -0,0 +1,34 @@
+from quantica.bitset import QBitNet
+from quantica.symbolic import QSymbolicNet
+
+from . import nets
+
+class SymbolicReachability:
+    params = (['bitset', 'symbolic'], [8, 12, 16])
+    param_names = ['engine', 'width']
+    timeout = 120
+
+    def setup(self, engine, width):
+        self.net = nets.forkjoin(width)
+
+    def time_reachable(self, engine, width):
+        if engine == 'bitset':
+            QBitNet(self.net).reachable()
+        else:
+            QSymbolicNet(self.net).reachable()
+
+class SymbolicScaling:
+    params = [50, 100, 200]
+    param_names = ['width']
+    timeout = 120
+
+    def setup(self, width):
+        self.net = nets.forkjoin(width)
+
+    def time_deadlock_free(self, width):
+        QSymbolicNet(self.net).isDeadlockFree()
+
+    def track_nodes(self, width):
+        sym = QSymbolicNet(self.net)
+        return sym.bdd.size(sym.reachable())
+    track_nodes.unit = 'nodes'
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from quantica.core import QNet
+from quantica.discretelogic import QOR, QAND, QNOT, QNAND
+from quantica.models import QTimed
+
+from . import nets
+
+class Gates:
+    params = ['QOR', 'QAND', 'QNOT', 'QNAND']
+    param_names = ['gate']
+
+    def setup(self, gate):
+        self.gate = {'QOR': QOR, 'QAND': QAND, 'QNOT': QNOT, 'QNAND': QNAND}[gate]()
+
+    def time_truth_table(self, gate):
+        for A in (False, True):
+            for B in (False, True):
+                self.gate.set(A, B)
+
+class Dispatch:
+    repeat = 20
+
+    def setup(self):
+        self.done = threading.Event()
+        self.net = QNet('Dispatch', logging_level=nets.LOGGING_LEVEL)
+        self.place = self.net.createPlace('P', target_task=self.done.set)
+
+    def track_dispatch_latency(self):
+        self.done.clear()
+        t0 = time.perf_counter()
+        self.net.produce(self.place, 1)
+        self.done.wait()
+        return time.perf_counter() - t0
+    track_dispatch_latency.unit = 'seconds'
+
+class Burst:
+    params = [False, True]
+    param_names = ['batched']
+    timeout = 120
+
+    def setup(self, batched):
+        self.net = QNet('Burst', logging_level=nets.LOGGING_LEVEL)
+        self.source = self.net.createPlace('Source', init_tokens=500)
+        self.sink = self.net.createPlace('Sink', target_task=lambda *args: None, batched=batched, batch_size=100)
+        t = self.net.createTransition('T')
+        self.net.connect(self.source, t, 1)
+        self.net.connect(t, self.sink, 1)
+        self.net.setBulkFiring(batched)
+
+    def time_drain_500_tokens(self, batched):
+        self.net.reset()
+        self.net.start_async()
+
+class Priorities:
+    params = [0, 10]
+    param_names = ['priority']
+    timeout = 120
+
+    def setup(self, priority):
+        self.net = QNet('Priorities', logging_level=nets.LOGGING_LEVEL)
+        for i in range(8):
+            source = self.net.createPlace('Source%d' % i, init_tokens=20)
+            t = self.net.createTransition('T%d' % i)
+            self.net.connect(source, t, 1)
+            self.net.connect(t, self.net.createPlace('Bulk%d' % i, target_task=lambda: time.sleep(0.001)), 1)
+        source = self.net.createPlace('Requests', init_tokens=20)
+        t = self.net.createTransition('Serve')
+        self.critical = self.net.createPlace('Critical', target_task=lambda: None, priority=priority)
+        self.net.connect(source, t, 1)
+        self.net.connect(t, self.critical, 1)
+        self.net.setTaskExecutor(2)
+        self.profiler = self.net.enableProfiling()
+
+    def track_critical_wait(self, priority):
+        self.net.start_async()
+        wait = self.profiler.snapshot()['task_wait'][self.critical]
+        return wait['sum'] / wait['count']
+    track_critical_wait.unit = 'seconds'
+
+class Timers:
+    params = [1, 10]
+    param_names = ['interval_ms']
+    timeout = 60
+
+    def setup(self, interval_ms):
+        self.net = QNet('Timers', logging_level=nets.LOGGING_LEVEL)
+        self.timer = QTimed('Timer', interval_ms)
+        self.net.addNet(self.timer)
+        self.X = self.net.createPlace('X', init_tokens=5)
+        self.Y = self.net.createPlace('Y')
+        self.net.connect(self.X, self.timer.T_IN, 1)
+        self.net.connect(self.timer.T_OUT, self.Y, 1)
+
+    def time_five_periods(self, interval_ms):
+        self.net.start_async()
+
+    def track_period_overhead(self, interval_ms):
+        self.net.reset()
+        t0 = time.perf_counter()
+        self.net.start_async()
+        return (time.perf_counter() - t0) / 5 - interval_ms / 1000.0
+    track_period_overhead.unit = 'seconds'
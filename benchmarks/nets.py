@@ -0,0 +1,61 @@
+import logging
+import random
+
+from quantica.core import QNet
+
+LOGGING_LEVEL = logging.WARNING
+
+def chain(n, label='Chain'):
+    net = QNet(label, logging_level=LOGGING_LEVEL)
+    with net.batch():
+        places = [net.createPlace('P%d' % i, init_tokens=int(i == 0)) for i in range(n)]
+        for i in range(n):
+            t = net.createTransition('T%d' % i)
+            net.connect(places[i], t, 1)
+            net.connect(t, places[(i + 1) % n], 1)
+    return net
+
+def forkjoin(width, label='ForkJoin'):
+    net = QNet(label, logging_level=LOGGING_LEVEL)
+    with net.batch():
+        start = net.createPlace('Start', init_tokens=1)
+        end = net.createPlace('End')
+        fork = net.createTransition('Fork')
+        join = net.createTransition('Join')
+        restart = net.createTransition('Restart')
+        net.connect(start, fork, 1)
+        net.connect(join, end, 1)
+        net.connect(end, restart, 1)
+        net.connect(restart, start, 1)
+        for i in range(width):
+            p_in = net.createPlace('In%d' % i)
+            p_out = net.createPlace('Out%d' % i)
+            t = net.createTransition('Work%d' % i)
+            net.connect(fork, p_in, 1)
+            net.connect(p_in, t, 1)
+            net.connect(t, p_out, 1)
+            net.connect(p_out, join, 1)
+    return net
+
+def dense(nplaces, ntransitions, density=0.1, seed=0, label='Dense'):
+    rnd = random.Random(seed)
+    net = QNet(label, logging_level=LOGGING_LEVEL)
+    with net.batch():
+        places = [net.createPlace('P%d' % i, init_tokens=rnd.randint(0, 3)) for i in range(nplaces)]
+        for i in range(ntransitions):
+            t = net.createTransition('T%d' % i)
+            inputs = [p for p in places if rnd.random() < density] or [rnd.choice(places)]
+            outputs = [p for p in places if rnd.random() < density] or [rnd.choice(places)]
+            for p in inputs:
+                net.connect(p, t, 1)
+            for p in outputs:
+                net.connect(t, p, 1)
+    return net
+
+def nested(depth, width, size, label='Nested'):
+    if depth == 0:
+        return chain(size, label=label)
+    net = QNet(label, logging_level=LOGGING_LEVEL)
+    for i in range(width):
+        net.addNet(nested(depth - 1, width, size, label='%s%d' % (label, i)))
+    return net
@@ -43,7 +43,7 @@ def offset():
 
 qnet = QNet('QTimed', logging_level=logging.INFO)
 X0 = qnet.createPlace('X0', init_tokens=5)
-X1 = qnet.createPlace('X1', init_tokens=0, target_task=onset)
+X1 = qnet.createPlace('X1', init_tokens=0, target_task=onset, priority=10)
 X2 = qnet.createPlace('X2', init_tokens=0)
 X3 = qnet.createPlace('X3', init_tokens=0, target_task=offset)
 
@@ -56,5 +56,6 @@ qnet.connect(t_onset.T_OUT, X1, 1)
 qnet.connect(t_onset.T_OUT, X2, 1)
 qnet.connect(X2, t_offset.T_IN, 1)
 qnet.connect(t_offset.T_OUT, X3, 1)
+qnet.setTaskExecutor(4)
 
 qnet.start_async()
@@ -0,0 +1,202 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Bitset engine for 1-safe QNets. Every place is a bit of a Python int, so a
+transition is enabled when `marking & pre == pre` and no inhibiting bit is set,
+and fires with a single clear/set of bits. The engine steps a marking like
+QNet does, without place tasks, and explores the reachable markings of the
+net for deadlock and safeness checks.
+"""
+
+import random
+
+import numpy as np
+
+def rules(net):
+    I, O, H, R = net.I, net.O, net.H, net.R
+    capacity = []
+    for uri in net.getPlacesURIs():
+        node, remap_uri = net.__resolve__(uri)
+        capacity.append(node.max_tokens_allowed if remap_uri is None else None)
+    rules = []
+    for t in range(I.shape[1]):
+        if not (I[:, t].any() or R[:, t].any()) or not O[:, t].any():
+            continue
+        if (I[:, t] > 1).any():
+            continue
+        need = block = clear = post = 0
+        unsafe = bool((O[:, t] > 1).any())
+        dead = False
+        for p in range(I.shape[0]):
+            bit = 1 << p
+            if I[p, t] > 0:
+                need |= bit
+                clear |= bit
+            if R[p, t] > 0:
+                clear |= bit
+            if H[p, t] == 1:
+                block |= bit
+            if O[p, t] > 0:
+                post |= bit
+                if capacity[p] == 1:
+                    block |= bit
+                elif capacity[p] == 0:
+                    dead = True
+        if dead:
+            continue
+        rules.append((t, need, block, clear, post, unsafe))
+    return rules
+
+class QBitNet(object):
+
+    def __init__(self, net):
+        self.__places__ = net.getPlacesURIs()
+        self.__transitions__ = net.getTransitionsURIs()
+        self.__label__ = net.getLabel()
+        self.__rules__ = rules(net)
+        self.__m0__ = self.encode(net.marking())
+        self.__m__ = self.__m0__
+
+    @property
+    def marking(self):
+        return self.__m__
+
+    @property
+    def places(self):
+        return list(self.__places__)
+
+    @property
+    def transitions(self):
+        return list(self.__transitions__)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        enabled = self.enabled()
+        if len(enabled) == 0:
+            raise StopIteration
+        self.fire(random.choice(enabled))
+        return self.__m__
+
+    def __explore__(self, m, limit):
+        seen = {m}
+        frontier = [m]
+        while len(frontier) > 0:
+            successors = []
+            for s in frontier:
+                for t, successor in self.__successors__(s):
+                    if successor is None:
+                        return seen, t
+                    if not successor in seen:
+                        seen.add(successor)
+                        successors.append(successor)
+                        if not limit is None and len(seen) > limit:
+                            raise Exception("QNet <%s> has more than %d reachable markings" % (self.__label__, limit))
+            frontier = successors
+        return seen, None
+
+    def __successors__(self, m):
+        for t, need, block, clear, post, unsafe in self.__rules__:
+            if m & need == need and not m & block:
+                keep = m & ~clear
+                if unsafe or keep & post:
+                    yield t, None
+                else:
+                    yield t, keep | post
+
+    def decode(self, m=None):
+        if m is None:
+            m = self.__m__
+        return np.array([(m >> p) & 1 for p in range(len(self.__places__))], dtype=np.int64)
+
+    def deadlocks(self, m=None, limit=None):
+        return [s for s in self.reachable(m, limit) if len(self.enabled(s)) == 0]
+
+    def enabled(self, m=None):
+        if m is None:
+            m = self.__m__
+        return [t for t, need, block, _, _, _ in self.__rules__ if m & need == need and not m & block]
+
+    def encode(self, x):
+        m = 0
+        for p, tokens in enumerate(np.asarray(x).tolist()):
+            if tokens > 1:
+                raise Exception("Place <%s> holds %d tokens: the marking is not 1-safe" % (self.__places__[p], tokens))
+            if tokens == 1:
+                m |= 1 << p
+        return m
+
+    def fire(self, t, m=None):
+        if isinstance(t, str):
+            t = self.__transitions__.index(t)
+        current = m is None
+        if current:
+            m = self.__m__
+        for s, successor in self.__successors__(m):
+            if s == t:
+                if successor is None:
+                    raise Exception("Firing <%s> puts a second token in a place of QNet <%s>"
+                                    % (self.__transitions__[t], self.__label__))
+                if current:
+                    self.__m__ = successor
+                return successor
+        raise Exception("Transition <%s> is not enabled" % self.__transitions__[t])
+
+    def formatState(self, m=None):
+        return ["%s=%d" % (uri, tokens) for uri, tokens in zip(self.__places__, self.decode(m).tolist())]
+
+    def isSafe(self, m=None, limit=None):
+        return self.__explore__(self.__m__ if m is None else m, limit)[1] is None
+
+    def reachable(self, m=None, limit=None):
+        seen, unsafe = self.__explore__(self.__m__ if m is None else m, limit)
+        if not unsafe is None:
+            raise Exception("Firing <%s> puts a second token in a place of QNet <%s>"
+                            % (self.__transitions__[unsafe], self.__label__))
+        return seen
+
+    def reset(self):
+        self.__m__ = self.__m0__
+
+    def state(self):
+        return self.formatState(self.__m__)
+
+    def sync(self, net):
+        for uri, tokens in zip(self.__places__, self.decode().tolist()):
+            node, remap_uri = net.__resolve__(uri)
+            if remap_uri is None:
+                node.setTokens(tokens)
+            elif tokens < node.getTokens(remap_uri):
+                node.consume(remap_uri, tokens - node.getTokens(remap_uri))
+            elif tokens > node.getTokens(remap_uri):
+                node.produce(remap_uri, tokens - node.getTokens(remap_uri))
+
+def isSafe(net, limit=None):
+    if (net.marking() > 1).any():
+        return False
+    return QBitNet(net).isSafe(limit=limit)
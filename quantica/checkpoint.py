@@ -0,0 +1,203 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Checkpoints of a running QNet. The marking and the places whose task was in
+flight are appended as fixed size, CRC-protected records to a file, with fsync
+calls batched over several records. Restoring reads the last complete record
+and resumes the in-flight place tasks.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+MAGIC = b'QCKP'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+RECORD = struct.Struct('<Qd')
+CRC = struct.Struct('<I')
+
+def __recordsize__(nplaces):
+    return RECORD.size + 8 * nplaces + (nplaces + 7) // 8 + CRC.size
+
+def __header__(places):
+    uris = '\n'.join(places).encode('utf-8')
+    return HEADER.pack(MAGIC, VERSION, len(uris)) + uris
+
+def __readheader__(f):
+    magic, version, size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise Exception("<%s> is not a QNet checkpoint file" % f.name)
+    uris = f.read(size).decode('utf-8')
+    return uris.split('\n') if len(uris) > 0 else []
+
+class QCheckpointer(object):
+
+    def __init__(self, net, path, interval=1.0, fsync_every=10, max_records=None):
+        self.__net__ = net
+        self.__path__ = path
+        self.__interval__ = interval
+        self.__fsync_every__ = fsync_every
+        self.__max_records__ = max_records
+        self.__places__ = net.getPlacesURIs()
+        self.__working__ = []
+        for i, uri in enumerate(self.__places__):
+            node, remap_uri = net.__resolve__(uri)
+            if remap_uri is None:
+                if not node.target_task is None:
+                    self.__working__.append((i, node.isWorking))
+            else:
+                self.__working__.append((i, lambda node=node, uri=remap_uri: node.isWorking(uri)))
+        self.__lock__ = threading.Lock()
+        self.__seq__ = 0
+        self.__records__ = 0
+        self.__pending__ = 0
+        self.__last__ = 0.0
+        self.__file__ = self.__open__()
+
+    def __open__(self):
+        if os.path.exists(self.__path__) and os.path.getsize(self.__path__) > 0:
+            places, last, offset = __scan__(self.__path__)
+            if places != self.__places__:
+                raise Exception("Checkpoint file <%s> belongs to a different QNet" % self.__path__)
+            if not last is None:
+                self.__seq__ = RECORD.unpack(last[:RECORD.size])[0]
+            f = open(self.__path__, 'r+b')
+            f.truncate(offset)
+            f.seek(0, os.SEEK_END)
+            return f
+        f = open(self.__path__, 'wb')
+        f.write(__header__(self.__places__))
+        f.flush()
+        os.fsync(f.fileno())
+        return f
+
+    def __pack__(self):
+        x = self.__net__.marking()
+        working = np.zeros(len(self.__places__), dtype=np.bool_)
+        for i, isWorking in self.__working__:
+            working[i] = isWorking()
+        self.__seq__ += 1
+        body = RECORD.pack(self.__seq__, time.time()) + x.astype('<i8').tobytes() + np.packbits(working).tobytes()
+        return body + CRC.pack(zlib.crc32(body))
+
+    def __rotate__(self, record):
+        tmp = self.__path__ + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(__header__(self.__places__))
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        self.__file__.close()
+        os.replace(tmp, self.__path__)
+        self.__file__ = open(self.__path__, 'r+b')
+        self.__file__.seek(0, os.SEEK_END)
+        self.__records__ = 1
+        self.__pending__ = 0
+
+    def checkpoint(self):
+        with self.__lock__:
+            record = self.__pack__()
+            if not self.__max_records__ is None and self.__records__ >= self.__max_records__:
+                self.__rotate__(record)
+            else:
+                self.__file__.write(record)
+                self.__records__ += 1
+                self.__pending__ += 1
+                if self.__pending__ >= self.__fsync_every__:
+                    self.sync()
+            self.__last__ = time.perf_counter()
+            return self.__seq__
+
+    def close(self):
+        with self.__lock__:
+            if not self.__file__ is None:
+                self.sync()
+                self.__file__.close()
+                self.__file__ = None
+
+    def maybe(self):
+        if time.perf_counter() - self.__last__ >= self.__interval__:
+            return self.checkpoint()
+        return None
+
+    def sync(self):
+        self.__file__.flush()
+        os.fsync(self.__file__.fileno())
+        self.__pending__ = 0
+
+def __scan__(path):
+    with open(path, 'rb') as f:
+        places = __readheader__(f)
+        size = __recordsize__(len(places))
+        offset = f.tell()
+        last = None
+        while True:
+            record = f.read(size)
+            if len(record) < size:
+                break
+            body = record[:-CRC.size]
+            if CRC.unpack(record[-CRC.size:])[0] != zlib.crc32(body):
+                break
+            last = body
+            offset += size
+    return places, last, offset
+
+def read(path):
+    places, last, _ = __scan__(path)
+    if last is None:
+        return None
+    seq, timestamp = RECORD.unpack(last[:RECORD.size])
+    n = len(places)
+    tokens = np.frombuffer(last, dtype='<i8', count=n, offset=RECORD.size).astype(np.int64)
+    working = np.unpackbits(np.frombuffer(last, dtype=np.uint8, offset=RECORD.size + 8 * n), count=n).astype(np.bool_)
+    return seq, timestamp, places, tokens, working
+
+def restore(net, path):
+    last = read(path)
+    if last is None:
+        return None
+    seq, _, places, tokens, working = last
+    if places != net.getPlacesURIs():
+        raise Exception("Checkpoint file <%s> belongs to a different QNet" % path)
+    for uri, n in zip(places, tokens.tolist()):
+        node, remap_uri = net.__resolve__(uri)
+        if remap_uri is None:
+            node.setTokens(n)
+        elif n < node.getTokens(remap_uri):
+            node.consume(remap_uri, n - node.getTokens(remap_uri))
+        elif n > node.getTokens(remap_uri):
+            node.produce(remap_uri, n - node.getTokens(remap_uri))
+    for uri in np.array(places)[working].tolist():
+        node, remap_uri = net.__resolve__(uri)
+        if remap_uri is None:
+            node.__dispatch__()
+    return seq
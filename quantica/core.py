@@ -27,25 +27,75 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import numpy as np
+import array
 import logging
+import os
 import random
 import threading
+import functools
 from abc import abstractmethod
-
-from xmlrpc.server import SimpleXMLRPCServer
-from xmlrpc.server import SimpleXMLRPCRequestHandler
-from socketserver import ThreadingMixIn
-import xmlrpc.client
+from contextlib import contextmanager
 
 import time
-import pykron
-from pykron.core import Task, AsyncRequest
+import collections
+
+from quantica.profiling import QProfiler
+
+# The XML-RPC layer (quantica.rpc), pykron, the shared memory, trace,
+# checkpoint, siphons and task executor modules are imported on first use to
+# keep `import quantica.core` cheap for short-lived processes that only build
+# and evaluate local nets.
 
-pykron.core.LOGGING_LEVEL = logging.DEBUG
-pykron.core.LOGGING_PATH = '.'
 FORMAT = '%(asctime)s.%(msecs)03d %(levelname)-5s %(message)s'
 
+STRIPES = [threading.Lock() for _ in range(64)]
+NET_FORMAT_VERSION = 1
+
+ARC_NORMAL = 'normal'
+ARC_INHIBITOR = 'inhibitor'
+ARC_RESET = 'reset'
+ARC_KINDS = (ARC_NORMAL, ARC_INHIBITOR, ARC_RESET)
+
+# Methods served by a QNet given an address. Methods reading or writing files
+# on the server (save, restore, recordings, checkpoints, shared memory) stay
+# local to its process.
+RPC_METHODS = ('consume', 'fire', 'fireMax', 'formatState', 'getConflicts', 'getConsumers', 'getDeadTransitions',
+               'getEnabledTransitions', 'getEnablingDegree', 'getKinds', 'getLabel', 'getNodeLabel', 'getPayloads',
+               'getPlacesURIs', 'getPostset', 'getPreset', 'getPriority', 'getProducers', 'getTokens',
+               'getTransitionsURIs', 'getWeights', 'ingest', 'isMaxLimitReached', 'isTransitionEnabled', 'isWorking',
+               'kind', 'pendingTasks', 'produce', 'reset', 'setPriority', 'state', 'weight')
+
+__pykron__ = None
+
+def __getattr__(name):
+    if name in ('RequestHandler', 'SimpleThreadedXMLRPCServer'):
+        from quantica import rpc
+        return getattr(rpc, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __npzpath__(path):
+    # np.savez appends the extension, load() must look for the same file
+    path = os.fspath(path)
+    return path if path.endswith('.npz') else path + '.npz'
+
+def __runtask__(target, args):
+    global __pykron__
+    if __pykron__ is None:
+        try:
+            import pykron.core
+            pykron.core.LOGGING_LEVEL = logging.DEBUG
+            pykron.core.LOGGING_PATH = '.'
+            __pykron__ = pykron.core
+        except ImportError:
+            __pykron__ = False
+    if __pykron__ is False:
+        target(*args)
+    else:
+        __pykron__.AsyncRequest(__pykron__.Task(target=target, args=args)).wait_for_completed()
+
 class QNode:
+    __slots__ = ('__label__',)
+
     def __init__(self, label: str):
         self.__label__ = label
 
@@ -56,54 +106,268 @@ class QNode:
         self.__label__ = label
 
 
+class QTokenStore(object):
+    __slots__ = ('__tokens__',)
+
+    def __init__(self):
+        self.__tokens__ = array.array('q')
+
+    def __getitem__(self, index):
+        return self.__tokens__[index]
+
+    def __setitem__(self, index, value):
+        self.__tokens__[index] = value
+
+    def __len__(self):
+        return len(self.__tokens__)
+
+    def allocate(self, tokens=0):
+        self.__tokens__.append(tokens)
+        return len(self.__tokens__) - 1
+
+    def gather(self, indices):
+        return np.frombuffer(self.__tokens__, dtype=np.int64)[indices]
+
+
+class QPlaceBuffer(object):
+    __slots__ = ('batched', 'batch_size', 'linger', 'pending', 'draining', 'payloads', 'inbox')
+
+    def __init__(self, batched=False, batch_size=None, linger_ms=0, colored=False, init_tokens=0):
+        self.batched = batched
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000.0
+        self.pending = 0
+        self.draining = False
+        self.payloads = collections.deque([None] * init_tokens) if colored else None
+        self.inbox = collections.deque() if colored and batched else None
+
+
 class QPlace(QNode):
-    def __init__(self, label: str, init_tokens: int=0, target_task=None, max_tokens_allowed=None):
+    __slots__ = ('__init_tokens__', '__target_task__', '__max_tokens_allowed__', '__working__',
+                 '__profiler__', '__store__', '__index__', '__buffer__', '__priority__', '__executor__',
+                 '__queued__')
+
+    def __init__(self, label: str, init_tokens: int=0, target_task=None, max_tokens_allowed=None, store=None,
+                 batched=False, batch_size=None, linger_ms=0, colored=False, priority=0):
         QNode.__init__(self, label)
         self.__init_tokens__ = init_tokens
-        self.reset()
+        self.__store__ = QTokenStore() if store is None else store
+        self.__index__ = self.__store__.allocate(init_tokens)
         self.__target_task__ = target_task
         self.__max_tokens_allowed__ = max_tokens_allowed
-        self.__working__ = threading.Lock()
+        self.__working__ = None if target_task is None else threading.Lock()
+        self.__profiler__ = None
+        # Batching and payload state is only allocated for the places using it.
+        self.__buffer__ = None
+        if batched or colored:
+            self.__buffer__ = QPlaceBuffer(batched, batch_size, linger_ms, colored, init_tokens)
+        self.__priority__ = priority
+        self.__executor__ = None
+        self.__queued__ = 0
+
+    @property
+    def batch_size(self):
+        return None if self.__buffer__ is None else self.__buffer__.batch_size
+
+    @property
+    def batched(self):
+        return not self.__buffer__ is None and self.__buffer__.batched
+
+    @property
+    def colored(self):
+        return not (self.__buffer__ is None or self.__buffer__.payloads is None)
+
+    @property
+    def index(self):
+        return self.__index__
+
+    @property
+    def init_tokens(self):
+        return self.__init_tokens__
+
+    @property
+    def linger_ms(self):
+        return 0.0 if self.__buffer__ is None else self.__buffer__.linger * 1000.0
+
+    @property
+    def max_tokens_allowed(self):
+        return self.__max_tokens_allowed__
+
+    @property
+    def priority(self):
+        return self.__priority__
+
+    @property
+    def store(self):
+        return self.__store__
+
+    @property
+    def target_task(self):
+        return self.__target_task__
+
+    def __dispatch__(self, n=1, payloads=None):
+        if self.__target_task__ is None:
+            return
+        produced_at = None if self.__profiler__ is None else time.perf_counter()
+        buffer = self.__buffer__
+        if payloads is None and self.colored:
+            payloads = [None] * n
+        if not self.batched:
+            if self.__executor__ is None:
+                threading.Thread(target=self.task, args=(produced_at, None, payloads)).start()
+            else:
+                # A queued task keeps its place working until it runs, as a started one does.
+                with STRIPES[self.stripe]:
+                    self.__queued__ += 1
+                self.__executor__.submit(self.__priority__, self.task, (produced_at, None, payloads, True))
+            return
+        with STRIPES[self.stripe]:
+            buffer.pending += n
+            if not buffer.inbox is None:
+                buffer.inbox.extend(payloads[-n:])
+            if buffer.draining:
+                return
+            buffer.draining = True
+        if self.__executor__ is None:
+            threading.Thread(target=self.__drain__, args=(produced_at,)).start()
+        else:
+            self.__executor__.submit(self.__priority__, self.__drain__, (produced_at,))
+
+    def __drain__(self, produced_at=None):
+        buffer = self.__buffer__
+        while True:
+            deadline = time.perf_counter() + buffer.linger
+            while (buffer.batch_size is None or buffer.pending < buffer.batch_size) \
+                    and time.perf_counter() < deadline:
+                time.sleep(0.0001)
+            with STRIPES[self.stripe]:
+                count = buffer.pending
+                if not buffer.batch_size is None:
+                    count = min(count, buffer.batch_size)
+                buffer.pending -= count
+                if count == 0:
+                    buffer.draining = False
+                    return
+                payloads = None
+                if not buffer.inbox is None:
+                    payloads = [buffer.inbox.popleft() for _ in range(count)]
+            self.task(produced_at, count, payloads)
+            if not produced_at is None:
+                produced_at = time.perf_counter()
+
+    def __increment__(self, n):
+        self.__store__[self.__index__] += n
+
+    def __put__(self, n, payloads=None):
+        items = [] if payloads is None else list(payloads[:n])
+        if len(items) < n:
+            items.extend([None] * (n - len(items)))
+        self.__buffer__.payloads.extend(items)
+        return items
+
+    def __take__(self, n):
+        queue = self.__buffer__.payloads
+        return [queue.popleft() for _ in range(min(n, len(queue)))]
 
-    def addTokens(self, n):
-        self.__tokens__ += n
+    @property
+    def stripe(self):
+        return ((id(self.__store__) >> 4) + self.__index__) % len(STRIPES)
+
+    def addTokens(self, n, payloads=None):
+        with STRIPES[self.stripe]:
+            self.__store__[self.__index__] += n
+            if not self.colored:
+                return None
+            if n < 0:
+                return self.__take__(-n)
+            return self.__put__(n, payloads)
 
     def consume(self, n):
         logging.debug("[%s] consuming %d token(s)..." % (self.getLabel(), n))
-        self.addTokens(-n)
+        return self.addTokens(-n)
+
+    def getPayloads(self):
+        with STRIPES[self.stripe]:
+            return list(self.__buffer__.payloads) if self.colored else None
 
     def getTokens(self):
-        return self.__tokens__
+        return self.__store__[self.__index__]
 
     def isMaxLimitReached(self):
         if not self.__max_tokens_allowed__ is None:
-            if self.__tokens__ == self.__max_tokens_allowed__:
+            if self.__store__[self.__index__] == self.__max_tokens_allowed__:
                 return True
         return False
 
+    def isDraining(self):
+        return not self.__buffer__ is None and self.__buffer__.draining
+
     def isWorking(self):
-        return self.__working__.locked()
+        return not self.__working__ is None and (self.__queued__ > 0 or self.__working__.locked())
 
-    def produce(self, n):
+    def produce(self, n, payloads=None):
         logging.debug("[%s] producing %d token(s)..." % (self.getLabel(), n))
-        self.addTokens(n)
+        payloads = self.addTokens(n, payloads)
         logging.debug("[%s] has %d token..." % (self.getLabel(), self.getTokens()))
-        threading.Thread(target=self.task).start()
+        self.__dispatch__(n, payloads)
 
     def reset(self):
-        self.__tokens__ = self.__init_tokens__
+        self.setTokens(self.__init_tokens__)
+
+    def setExecutor(self, executor):
+        self.__executor__ = executor
+
+    def setPriority(self, priority):
+        self.__priority__ = priority
+
+    def setProfiler(self, profiler):
+        self.__profiler__ = profiler
 
-    def task(self):
+    def setTokens(self, n):
+        with STRIPES[self.stripe]:
+            self.__store__[self.__index__] = n
+            if self.colored:
+                queue = self.__buffer__.payloads
+                while len(queue) > n:
+                    queue.popleft()
+                self.__put__(n - len(queue))
+
+    def task(self, produced_at=None, count=None, payloads=None, queued=False):
         if not self.__target_task__ is None:
             with self.__working__:
-                logging.debug("[%s] executing task ..." % self.getLabel())
-                task = Task(target=self.__target_task__,args=())
-                AsyncRequest(task).wait_for_completed()
+                if queued:
+                    with STRIPES[self.stripe]:
+                        self.__queued__ -= 1
+                profiler = self.__profiler__
+                if not (profiler is None or produced_at is None):
+                    started_at = time.perf_counter()
+                    profiler.observeTaskWait(self.getLabel(), started_at - produced_at)
+                if not payloads is None:
+                    logging.debug("[%s] executing task on %d payload(s) ..." % (self.getLabel(), len(payloads)))
+                    __runtask__(self.__target_task__, (payloads,))
+                elif count is None:
+                    logging.debug("[%s] executing task ..." % self.getLabel())
+                    __runtask__(self.__target_task__, ())
+                else:
+                    logging.debug("[%s] executing task on %d token(s) ..." % (self.getLabel(), count))
+                    __runtask__(self.__target_task__, (count,))
                 logging.debug("[%s] task executed task!" % self.getLabel())
+                if not (profiler is None or produced_at is None):
+                    profiler.observeTaskRun(self.getLabel(), time.perf_counter() - started_at)
 
 class QTransition(QNode):
-    def __init__(self, label: str):
+    __slots__ = ('__priority__',)
+
+    def __init__(self, label: str, priority=0):
         QNode.__init__(self, label)
+        self.__priority__ = priority
+
+    @property
+    def priority(self):
+        return self.__priority__
+
+    def setPriority(self, priority):
+        self.__priority__ = priority
 
 class QMatrix(object):
     def __init__(self):
@@ -147,26 +411,44 @@ class QInputMatrix(QMatrix):
         QMatrix.__init__(self)
 
     def update(self, net):
-        I = []
-        for p_uri in net.getPlacesURIs():
-            row = []
-            for t_uri in net.getTransitionsURIs():
-                row.append(net.weight(p_uri, t_uri))
-            I.append(row)
-        self.set(I)
+        I = np.zeros((net.nplaces, net.ntransitions), dtype=int)
+        for (src_uri, dst_uri), weight in net.__weights__.items():
+            if src_uri in net.__pindex__ and dst_uri in net.__tindex__ and not (src_uri, dst_uri) in net.__kinds__:
+                I[net.__pindex__[src_uri], net.__tindex__[dst_uri]] = weight
+        self.__M__ = I
 
 class QOutputMatrix(QMatrix):
     def __init__(self):
         QMatrix.__init__(self)
 
     def update(self, net):
-        O = []
-        for p_uri in net.getPlacesURIs():
-            row = []
-            for t_uri in net.getTransitionsURIs():
-                row.append(net.weight(t_uri, p_uri))
-            O.append(row)
-        self.set(O)
+        O = np.zeros((net.nplaces, net.ntransitions), dtype=int)
+        for (src_uri, dst_uri), weight in net.__weights__.items():
+            if src_uri in net.__tindex__ and dst_uri in net.__pindex__:
+                O[net.__pindex__[dst_uri], net.__tindex__[src_uri]] = weight
+        self.__M__ = O
+
+class QInhibitorMatrix(QMatrix):
+    def __init__(self):
+        QMatrix.__init__(self)
+
+    def update(self, net):
+        H = np.zeros((net.nplaces, net.ntransitions), dtype=int)
+        for (src_uri, dst_uri), kind in net.__kinds__.items():
+            if kind == ARC_INHIBITOR:
+                H[net.__pindex__[src_uri], net.__tindex__[dst_uri]] = net.__weights__[(src_uri, dst_uri)]
+        self.__M__ = H
+
+class QResetMatrix(QMatrix):
+    def __init__(self):
+        QMatrix.__init__(self)
+
+    def update(self, net):
+        R = np.zeros((net.nplaces, net.ntransitions), dtype=int)
+        for (src_uri, dst_uri), kind in net.__kinds__.items():
+            if kind == ARC_RESET:
+                R[net.__pindex__[src_uri], net.__tindex__[dst_uri]] = 1
+        self.__M__ = R
 
 class QIncidenceMatrix(QMatrix):
     def __init__(self):
@@ -175,10 +457,112 @@ class QIncidenceMatrix(QMatrix):
     def update(self, net):
         self.__M__ = net.O - net.I
 
-class RequestHandler(SimpleXMLRPCRequestHandler):
-    rpc_paths = ('/RPC2',)
+class QAdjacency(object):
+    __slots__ = ('__indptr__', '__indices__')
+
+    def __init__(self, M):
+        rows, cols = np.nonzero(M)
+        self.__indptr__ = np.zeros(M.shape[0] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=M.shape[0]), out=self.__indptr__[1:])
+        self.__indices__ = cols.astype(np.intp)
+
+    @classmethod
+    def fromPairs(cls, n, rows, cols, ncols=None):
+        ncols = max(n if ncols is None else ncols, 1)
+        keys = np.unique(rows.astype(np.intp) * ncols + cols)
+        adjacency = cls.__new__(cls)
+        adjacency.__indptr__ = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(keys // ncols, minlength=n), out=adjacency.__indptr__[1:])
+        adjacency.__indices__ = keys % ncols
+        return adjacency
+
+    def __getitem__(self, i):
+        return self.__indices__[self.__indptr__[i]:self.__indptr__[i + 1]]
+
+    def __len__(self):
+        return len(self.__indptr__) - 1
+
+    @property
+    def indices(self):
+        return self.__indices__
+
+    @property
+    def indptr(self):
+        return self.__indptr__
+
+    def degree(self):
+        return np.diff(self.__indptr__)
+
+class QStructure(object):
+
+    def __init__(self, I, O, inhibitors=None, resets=None):
+        # Inhibitor and reset arcs are few: they come as (places, transitions,
+        # weights) index arrays rather than as dense P x T matrices.
+        none = np.zeros(0, dtype=np.intp)
+        hp, ht, hw = (none, none, none) if inhibitors is None else inhibitors
+        rp, rt, _ = (none, none, none) if resets is None else resets
+        I = I > 0
+        O = O > 0
+        I[rp, rt] = True
+        self.__dead__ = (I.sum(axis=0) == 0) | (O.sum(axis=0) == 0)
+        self.__preset__ = QAdjacency(I.T)
+        self.__postset__ = QAdjacency(O.T)
+        self.__inhibitors__ = QAdjacency.fromPairs(I.shape[1], ht, hp, I.shape[0])
+        self.__inhibitorWeights__ = dict(zip(zip(hp.tolist(), ht.tolist()), hw.tolist()))
+        self.__resets__ = set(zip(rp.tolist(), rt.tolist()))
+        self.__consumers__ = QAdjacency(I)
+        self.__producers__ = QAdjacency(O)
+        rows = [np.zeros(0, dtype=np.intp)]
+        cols = [np.zeros(0, dtype=np.intp)]
+        for p in np.flatnonzero(self.__consumers__.degree() > 1):
+            consumers = self.__consumers__[p]
+            rows.append(np.repeat(consumers, len(consumers)))
+            cols.append(np.tile(consumers, len(consumers)))
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        distinct = rows != cols
+        self.__conflicts__ = QAdjacency.fromPairs(I.shape[1], rows[distinct], cols[distinct])
+
+    @property
+    def conflicts(self):
+        return self.__conflicts__
+
+    @property
+    def consumers(self):
+        return self.__consumers__
+
+    @property
+    def dead(self):
+        return self.__dead__
+
+    @property
+    def inhibitors(self):
+        return self.__inhibitors__
+
+    def inhibitorWeight(self, p, t):
+        return self.__inhibitorWeights__.get((p, t), 0)
+
+    def isReset(self, p, t):
+        return (p, t) in self.__resets__
+
+    @property
+    def live(self):
+        return np.flatnonzero(~self.__dead__)
+
+    @property
+    def postset(self):
+        return self.__postset__
+
+    @property
+    def preset(self):
+        return self.__preset__
+
+    @property
+    def producers(self):
+        return self.__producers__
 
 class QNodeList(object):
+    __slots__ = ('__nodes__',)
 
     def __init__(self):
         self.__nodes__ = {}
@@ -201,9 +585,6 @@ class QNodeList(object):
     def values(self):
         return self.__nodes__.values()
 
-class SimpleThreadedXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
-    pass
-
 class QNet(QNode):
 
     def __init__(self, label, address=None, logging_level=logging.DEBUG, format=FORMAT):
@@ -211,14 +592,38 @@ class QNet(QNode):
         logging.basicConfig(level=logging_level, format=FORMAT, datefmt='%H:%M:%S')
         self.__places__ = QNodeList()
         self.__transitions__ = QNodeList()
+        self.__store__ = QTokenStore()
         self.__weights__ = {}
+        self.__kinds__ = {}
         self.__URIs__ = {}
         self.__subnet_URIs__ = {}
+        self.__subnet_rURIs__ = {}
         self.__I__ = QInputMatrix()
         self.__O__ = QOutputMatrix()
         self.__C__ = QIncidenceMatrix()
         self.__x__ = QMatrix()
+        self.__placesURIs__ = []
+        self.__transitionsURIs__ = []
+        self.__pindex__ = {}
+        self.__tindex__ = {}
+        self.__deferred__ = 0
+        self.__readers__ = None
+        self.__priorities__ = None
+        self.__rules__ = {}
+        self.__structure__ = None
+        self.__live__ = []
+        self.__xview__ = None
+        self.__structured__ = False
+        self.__bulk__ = False
+        self.__inbox__ = collections.deque()
+        self.__sources__ = []
+        self.__profiler__ = None
+        self.__executor__ = None
+        self.__trace__ = None
+        self.__shared__ = None
+        self.__checkpointer__ = None
         self.__address__ = address
+        self.__server__ = None
         if not address is None:
             threading.Timer(0.0, self.__rpcserver__).start()
 
@@ -238,6 +643,23 @@ class QNet(QNode):
     def C(self):
         return self.__C__.value
 
+    @property
+    def H(self):
+        # Built on demand: the net keeps inhibitor and reset arcs sparse.
+        H = QInhibitorMatrix()
+        H.update(self)
+        return H.value
+
+    @property
+    def R(self):
+        R = QResetMatrix()
+        R.update(self)
+        return R.value
+
+    @property
+    def structure(self):
+        return self.__structure__
+
     @property
     def nplaces(self):
         return len(self.__places__)
@@ -256,158 +678,593 @@ class QNet(QNode):
         return "%s.%s" % (label, suffix)
 
     def __getSubnetURI__(self, net, uri):
-        for k, v in self.__subnet_URIs__[net.getLabel()].items():
-            if v == uri:
-                return k
-        return None
+        return self.__subnet_rURIs__[net.getLabel()].get(uri, None)
 
     def __rpcserver__(self):
-        with SimpleThreadedXMLRPCServer(self.__address__, requestHandler=RequestHandler, allow_none=True, logRequests=False) as server:
+        from quantica import rpc
+        with rpc.SimpleThreadedXMLRPCServer(self.__address__, requestHandler=rpc.RequestHandler, allow_none=True,
+                                            logRequests=False) as server:
             server.register_introspection_functions()
-            server.register_instance(self)
+            for name in RPC_METHODS:
+                server.register_function(getattr(self, name), name)
+            self.__server__ = server
             server.serve_forever()
 
+    def __rpcshutdown__(self):
+        if not self.__server__ is None:
+            self.__server__.shutdown()
+            self.__server__ = None
+
+    def __resolve__(self, uri):
+        node = self.getNode(uri)
+        if isinstance(node, QNet):
+            return node.__resolve__(self.__subnet_URIs__[node.getLabel()][uri])
+        if isinstance(node, (QPlace, QTransition)):
+            return node, None
+        return node, self.__subnet_URIs__[node.getLabel()][uri]
+
+    def __traceMarking__(self, x0):
+        delta = self.__refresh__() - x0
+        for p in np.flatnonzero(delta).tolist():
+            self.__trace__.recordTokens(p, int(delta[p]))
+
+    def __arcIndices__(self, kind):
+        arcs = [arc for arc, k in self.__kinds__.items() if k == kind]
+        places = np.array([self.__pindex__[src_uri] for src_uri, _ in arcs], dtype=np.intp)
+        transitions = np.array([self.__tindex__[dst_uri] for _, dst_uri in arcs], dtype=np.intp)
+        weights = np.array([self.__weights__[arc] for arc in arcs], dtype=np.int64)
+        return places, transitions, weights
+
+    def __getPriorities__(self):
+        if self.__priorities__ is None:
+            priorities = {uri: self.getPriority(uri) for uri in self.__live__}
+            self.__priorities__ = priorities if any(priorities.values()) else {}
+        return self.__priorities__
+
+    def __getReaders__(self):
+        if self.__readers__ is None:
+            stores = {}
+            readers = []
+            for i, uri in enumerate(self.__placesURIs__):
+                node, remap_uri = self.__resolve__(uri)
+                if isinstance(node, QPlace):
+                    store, positions, indices = stores.setdefault(id(node.store), (node.store, [], []))
+                    positions.append(i)
+                    indices.append(node.index)
+                else:
+                    readers.append((i, functools.partial(node.getTokens, remap_uri)))
+            gathers = [(store, np.array(positions, dtype=np.intp), np.array(indices, dtype=np.intp))
+                       for store, positions, indices in stores.values()]
+            self.__readers__ = (gathers, readers)
+        return self.__readers__
+
+    def __getRule__(self, t_uri):
+        rule = self.__rules__.get(t_uri, None)
+        if rule is None:
+            t = self.__tindex__[t_uri]
+            stripes = set()
+            entries = []
+            colored = False
+            places = np.union1d(self.__structure__.preset[t], self.__structure__.postset[t])
+            for p in np.union1d(places, self.__structure__.inhibitors[t]):
+                p_uri = self.__placesURIs__[p]
+                node, remap_uri = self.__resolve__(p_uri)
+                if remap_uri is None:
+                    stripes.add(node.stripe)
+                    colored = colored or node.colored
+                entries.append((p_uri, node, remap_uri, int(self.I[p, t]), int(self.O[p, t]),
+                                self.__structure__.inhibitorWeight(p, t), self.__structure__.isReset(p, t)))
+            rule = (tuple(STRIPES[i] for i in sorted(stripes)), entries, not self.__structure__.dead[t], colored)
+            self.__rules__[t_uri] = rule
+        return rule
+
+    def __busy__(self):
+        if len(self.__inbox__) > 0:
+            return True
+        if len(self.__sources__) > 0:
+            self.__sources__ = [source for source in self.__sources__ if source.is_alive()]
+            if len(self.__sources__) > 0:
+                return True
+        return self.pendingTasks()
+
+    def __enablingDegree__(self, entries, limit=None):
+        degree = limit
+        for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+            if remap_uri is None:
+                if place.isWorking():
+                    return 0
+                if o_weight > 0 and place.isMaxLimitReached():
+                    return 0
+                tokens = place.getTokens()
+                max_tokens = place.max_tokens_allowed
+                single = not (place.target_task is None or place.batched)
+            else:
+                if place.isWorking(remap_uri):
+                    return 0
+                if o_weight > 0 and place.isMaxLimitReached(remap_uri):
+                    return 0
+                tokens = place.getTokens(remap_uri)
+                max_tokens = None
+                single = True
+            if h_weight > 0 and tokens >= h_weight:
+                return 0
+            bounds = []
+            if i_weight > 0:
+                bounds.append(tokens // i_weight)
+            res = o_weight - i_weight
+            if reset:
+                bounds.append(1)
+            elif res > 0:
+                if not max_tokens is None:
+                    bounds.append(max(0, (max_tokens - tokens) // res))
+                if single:
+                    bounds.append(1)
+                if h_weight > 0:
+                    bounds.append((h_weight - tokens + res - 1) // res)
+            for bound in bounds:
+                degree = bound if degree is None else min(degree, bound)
+        return 0 if degree is None else degree
+
+    def __fire__(self, t_uri, k):
+        locks, entries, live, colored = self.__getRule__(t_uri)
+        moved = {}
+        remote = []
+        for lock in locks:
+            lock.acquire()
+        try:
+            if k is None:
+                k = self.__enablingDegree__(entries) if live else 0
+                if k == 0:
+                    return 0
+            elif k == 1:
+                if not self.__isEnabled__(entries):
+                    return 0
+            elif self.__enablingDegree__(entries, k) < k:
+                return 0
+            if not self.__profiler__ is None:
+                self.__profiler__.countFiring(t_uri, k)
+            if not self.__trace__ is None:
+                self.__trace__.record(self.__tindex__[t_uri], k)
+            if k == 1:
+                logging.debug("[%s] %s firing... " % (self.getLabel(), t_uri))
+            else:
+                logging.debug("[%s] %s firing %d times... " % (self.getLabel(), t_uri, k))
+            if colored:
+                # Payloads move occurrence by occurrence, as if fired k times in a row.
+                for _ in range(k):
+                    taken = []
+                    for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+                        if reset and remap_uri is None and place.colored:
+                            place.__take__(place.getTokens())
+                        elif i_weight > 0 and remap_uri is None and place.colored:
+                            taken.extend(place.__take__(i_weight))
+                    for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+                        if o_weight > 0 and remap_uri is None and place.colored:
+                            moved.setdefault(p_uri, []).extend(place.__put__(o_weight, taken))
+            for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+                res = (o_weight - i_weight) * k
+                if reset:
+                    res -= place.getTokens() if remap_uri is None else place.getTokens(remap_uri)
+                if res == 0:
+                    continue
+                if remap_uri is None:
+                    place.__increment__(res)
+                else:
+                    remote.append((place, remap_uri, res))
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        # Remote places are updated once the stripes are released: a net served
+        # by this same process takes the stripes of its own places to apply them.
+        for place, remap_uri, res in remote:
+            if res < 0:
+                place.consume(remap_uri, res)
+            else:
+                place.produce(remap_uri, res)
+        for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+            if remap_uri is None and o_weight > i_weight:
+                place.__dispatch__((o_weight - i_weight) * k, moved.get(p_uri, None))
+        if not self.__shared__ is None:
+            self.__shared__.publish()
+        logging.debug("[%s] %s fire completed!" % (self.getLabel(), t_uri))
+        return k
+
+    def __ingest__(self):
+        events = {}
+        inbox = self.__inbox__
+        for _ in range(len(inbox)):
+            event = inbox.popleft()
+            events.setdefault(event[0], []).append(event)
+        for p_uri, group in events.items():
+            payloads = None
+            if any(len(event) > 2 and not event[2] is None for event in group):
+                # Each event brings exactly its count of payloads, so that they
+                # stay with their own tokens once the events are coalesced.
+                payloads = []
+                for event in group:
+                    items = [] if len(event) < 3 or event[2] is None else list(event[2][:event[1]])
+                    payloads.extend(items + [None] * (event[1] - len(items)))
+            self.produce(p_uri, sum(event[1] for event in group), payloads)
+        return len(events)
+
+    def __idle__(self):
+        if not self.__shared__ is None:
+            self.__shared__.publish(min_interval=0.01)
+        if self.__profiler__ is None:
+            time.sleep(0.0001)
+        else:
+            t0 = time.perf_counter()
+            time.sleep(0.0001)
+            self.__profiler__.observeIdle(time.perf_counter() - t0)
+
+    def __isEnabled__(self, entries):
+        enabled = True
+        for p_uri, place, remap_uri, i_weight, o_weight, h_weight, reset in entries:
+            if remap_uri is None:
+                if place.isWorking():
+                    return False
+                if o_weight > 0 and place.isMaxLimitReached():
+                    return False
+                tokens = place.getTokens()
+                # As in __enablingDegree__, a firing may not take a place past its capacity.
+                if o_weight > i_weight and not (reset or place.max_tokens_allowed is None) \
+                        and tokens + o_weight - i_weight > place.max_tokens_allowed:
+                    return False
+            else:
+                if place.isWorking(remap_uri):
+                    return False
+                if o_weight > 0 and place.isMaxLimitReached(remap_uri):
+                    return False
+                tokens = place.getTokens(remap_uri)
+            if tokens < i_weight or (h_weight > 0 and tokens >= h_weight):
+                enabled = False
+        return enabled
+
+    def __refresh__(self):
+        x = self.__x__.value
+        gathers, readers = self.__getReaders__()
+        for store, positions, indices in gathers:
+            x[positions] = store.gather(indices)
+        for i, reader in readers:
+            x[i] = reader()
+        return x
+
+    def __setProfiler__(self, profiler):
+        self.__profiler__ = profiler
+        for uri in self.__placesURIs__:
+            node, _ = self.__resolve__(uri)
+            if isinstance(node, (QPlace, QNetRemote)):
+                node.setProfiler(profiler)
+
+    def __startParallel__(self, workers):
+        # Firing is pure Python and holds the GIL: the pool overlaps firings
+        # waiting on remote places, it does not spread local ones over cores.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                if len(self.__inbox__) > 0:
+                    self.__ingest__()
+                fire = self.fireMax if self.__bulk__ else self.fire
+                fired = 0
+                for group in self.getConflictFreeGroups(self.getEnabledTransitions()):
+                    if len(group) == 1:
+                        fired += fire(group[0])
+                    else:
+                        fired += sum(pool.map(fire, group))
+                if not self.__checkpointer__ is None:
+                    self.__checkpointer__.maybe()
+                if fired == 0:
+                    if not self.__busy__():
+                        break
+                    self.__idle__()
+
     def __update__(self):
+        if self.__deferred__ > 0:
+            return
+        self.__placesURIs__ = sorted(self.__places__.keys())
+        self.__transitionsURIs__ = sorted(self.__transitions__.keys())
+        self.__pindex__ = {uri: i for i, uri in enumerate(self.__placesURIs__)}
+        self.__tindex__ = {uri: i for i, uri in enumerate(self.__transitionsURIs__)}
+        self.__readers__ = None
+        self.__priorities__ = None
+        self.__rules__ = {}
+        self.__x__.set(np.zeros(len(self.__placesURIs__), dtype=np.int64))
+        self.__xview__ = self.__x__.value.view()
+        self.__xview__.flags.writeable = False
         self.__I__.update(self)
         self.__O__.update(self)
         self.__C__.update(self)
+        self.__structure__ = QStructure(self.I, self.O, self.__arcIndices__(ARC_INHIBITOR),
+                                        self.__arcIndices__(ARC_RESET))
+        self.__live__ = [self.__transitionsURIs__[t] for t in self.__structure__.live]
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        v = self.getEnabledTransitions()
-        if len(v) > 0:
-            self.fire(v[0])
-            x = []
-            for uri in self.getPlacesURIs():
-                place = self.getNode(uri)
-
-                if isinstance(place, QPlace):
-                    res = place.getTokens()
-                else:
-                    res = place.getTokens(self.__subnet_URIs__[place.getLabel()][uri])
-
-                x.append(res)
-            self.__x__.set(x)
-            return self.state()
-
-        if len(v) == 0:
-            raise StopIteration
+        if len(self.__inbox__) > 0:
+            self.__ingest__()
+        for t_uri in self.getEnabledTransitions():
+            if (self.fireMax(t_uri) if self.__bulk__ else self.fire(t_uri)):
+                x = self.__refresh__()
+                if self.__structured__:
+                    return self.__xview__
+                return self.formatState(x)
+        raise StopIteration
 
     def addNode(self, node: QNode, uri: str):
-        if (uri in self.getPlacesURIs()) or (uri in self.getTransitionsURIs()):
+        if (uri in self.__places__.keys()) or (uri in self.__transitions__.keys()):
             raise Exception('URI <%s> already present! Please use a unique URI instead' % uri)
         if isinstance(node, QTransition):
             self.__transitions__[uri] = node
         elif isinstance(node, QPlace):
             self.__places__[uri] = node
+            if not self.__executor__ is None:
+                node.setExecutor(self.__executor__)
         self.__update__()
 
     def addNet(self, net):
-        if net.getLabel() in self.__subnet_URIs__.keys():
-            raise Exception("QNet <%s> already exists. Please use a unique identifier" % net.getLabel())
-
-        self.__subnet_URIs__[net.getLabel()] = {}
+        label = net.getLabel()
+        if label in self.__subnet_URIs__.keys():
+            raise Exception("QNet <%s> already exists. Please use a unique identifier" % label)
+
+        uris = {}
+        ruris = {}
+        places = {}
+        transitions = {}
         for p_uri in net.getPlacesURIs():
             uri = self.__generateURI__(label=net.getNodeLabel(p_uri))
-            self.__places__[uri] = net #QNodes present in external QNet
-            self.__subnet_URIs__[net.getLabel()][uri] = p_uri
+            places[uri] = net #QNodes present in external QNet
+            uris[uri] = p_uri
+            ruris[p_uri] = uri
 
         for t_uri in net.getTransitionsURIs():
             uri = self.__generateURI__(label=net.getNodeLabel(t_uri))
-            self.__transitions__[uri] = net #QNodes present in external QNet
-            self.__subnet_URIs__[net.getLabel()][uri] = t_uri
-
-        for src_uri, dst_uri in net.getArcs():
-            mapped_src_uri = self.__getSubnetURI__(net, src_uri)
-            mapped_dst_uri = self.__getSubnetURI__(net, dst_uri)
-            self.connect(mapped_src_uri, mapped_dst_uri, net.weight(src_uri, dst_uri))
-
-    def connect(self, src_uri: str, dst_uri: str, weight: int):
+            transitions[uri] = net #QNodes present in external QNet
+            uris[uri] = t_uri
+            ruris[t_uri] = uri
+
+        for uri in uris.keys():
+            if uri in self.__places__.keys() or uri in self.__transitions__.keys():
+                raise Exception('URI <%s> already present! Please use a unique URI instead' % uri)
+
+        weights = {}
+        for src_uri, dst_uri, weight in net.getWeights():
+            arc = (ruris[src_uri], ruris[dst_uri])
+            if arc in self.__weights__:
+                raise Exception('Connection between %s and %s already present!' % arc)
+            weights[arc] = weight
+        kinds = {(ruris[src_uri], ruris[dst_uri]): kind for src_uri, dst_uri, kind in net.getKinds()}
+
+        with self.batch():
+            self.__subnet_URIs__[label] = uris
+            self.__subnet_rURIs__[label] = ruris
+            for uri, node in places.items():
+                self.__places__[uri] = node
+            for uri, node in transitions.items():
+                self.__transitions__[uri] = node
+            self.__weights__.update(weights)
+            self.__kinds__.update(kinds)
+        logging.debug("[%s] added QNet [%s] with %d arcs ... " % (self.getLabel(), label, len(weights)))
+
+    @contextmanager
+    def batch(self):
+        self.__deferred__ += 1
+        try:
+            yield self
+        finally:
+            self.__deferred__ -= 1
+            self.__update__()
+
+    def connect(self, src_uri: str, dst_uri: str, weight: int, kind=ARC_NORMAL):
         if (src_uri, dst_uri) in self.arcs:
             raise Exception('Connection between %s and %s already present!' % (src_uri, dst_uri))
+        if not kind in ARC_KINDS:
+            raise Exception('Unknown arc kind <%s>' % kind)
+        if kind != ARC_NORMAL:
+            if not (src_uri in self.__places__.keys() and dst_uri in self.__transitions__.keys()):
+                raise Exception('A %s arc must go from a place to a transition' % kind)
+            self.__kinds__[(src_uri, dst_uri)] = kind
         self.__weights__[(src_uri, dst_uri)] = weight
         self.__update__()
         logging.debug("[%s] connected [%s] to [%s] ... " % (self.getLabel(), src_uri, dst_uri))
 
     def consume(self, p_uri, weight):
         place = self.__places__[p_uri]
+        if not self.__trace__ is None:
+            self.__trace__.recordTokens(self.__pindex__[p_uri], weight)
         if isinstance(place, QPlace):
-            place.consume(-weight)
-        else:
-            place.consume(self.__subnet_URIs__[place.getLabel()][p_uri], weight)
+            return place.consume(-weight)
+        return place.consume(self.__subnet_URIs__[place.getLabel()][p_uri], weight)
 
-    def createPlace(self, label=None, init_tokens=0, target_task=None, max_tokens_allowed=None):
+    def createPlace(self, label=None, init_tokens=0, target_task=None, max_tokens_allowed=None, batched=False,
+                    batch_size=None, linger_ms=0, colored=False, priority=0):
         if label is None:
             label = 'P' + str(self.nplaces)
-        p = QPlace(label, init_tokens, target_task=target_task, max_tokens_allowed=max_tokens_allowed)
+        p = QPlace(label, init_tokens, target_task=target_task, max_tokens_allowed=max_tokens_allowed, store=self.__store__,
+                   batched=batched, batch_size=batch_size, linger_ms=linger_ms, colored=colored, priority=priority)
         uri = self.__generateURI__(label, suffix=self.getLabel())
         p.setLabel(uri)
         self.addNode(p, uri)
         return uri
 
-    def createTransition(self, label=None, uri=None):
+    def createTransition(self, label=None, uri=None, priority=0):
         if label is None:
             label = 'T' + str(self.ntransitions)
-        t = QTransition(label=label)
+        t = QTransition(label=label, priority=priority)
         uri = self.__generateURI__(label, suffix=self.getLabel())
         t.setLabel(uri)
         self.addNode(t, uri)
         return uri
 
-    def fire(self, t_uri):
-        logging.debug("[%s] %s firing... " % (self.getLabel(), t_uri))
-        for p_uri in self.getPlacesURIs():
-            res = self.weight(t_uri, p_uri) - self.weight(p_uri, t_uri)
-            if res < 0:
-                self.consume(p_uri, res)
-            elif res > 0:
-                self.produce(p_uri, res)
-        logging.debug("[%s] %s fire completed!" % (self.getLabel(), t_uri))
+    def flatten(self):
+        net = QNet(self.getLabel(), logging_level=logging.getLogger().level)
+        labels = {}
+        with net.batch():
+            for uri in self.getPlacesURIs() + self.getTransitionsURIs():
+                node, remap_uri = self.__resolve__(uri)
+                if isinstance(node, QTransition):
+                    net.__transitions__[uri] = node
+                elif isinstance(node, QPlace):
+                    net.__places__[uri] = node
+                else: #QNodes present in a remote QNet
+                    if not id(node) in labels:
+                        labels[id(node)] = node.getLabel()
+                        net.__subnet_URIs__[labels[id(node)]] = {}
+                        net.__subnet_rURIs__[labels[id(node)]] = {}
+                    if uri in self.__places__.keys():
+                        net.__places__[uri] = node
+                    else:
+                        net.__transitions__[uri] = node
+                    net.__subnet_URIs__[labels[id(node)]][uri] = remap_uri
+                    net.__subnet_rURIs__[labels[id(node)]][remap_uri] = uri
+            net.__weights__.update(self.__weights__)
+            net.__kinds__.update(self.__kinds__)
+        return net
+
+    def disableCheckpoints(self):
+        if not self.__checkpointer__ is None:
+            self.__checkpointer__.close()
+            self.__checkpointer__ = None
+
+    def enableCheckpoints(self, path, interval=1.0, fsync_every=10, max_records=None):
+        from quantica import checkpoint
+        self.disableCheckpoints()
+        self.__checkpointer__ = checkpoint.QCheckpointer(self, path, interval=interval, fsync_every=fsync_every,
+                                                         max_records=max_records)
+        return self.__checkpointer__
+
+    def enableProfiling(self, profiler=None):
+        if profiler is None:
+            profiler = QProfiler(self.getLabel())
+        self.__setProfiler__(profiler)
+        return profiler
+
+    def disableProfiling(self):
+        self.__setProfiler__(None)
+
+    def fire(self, t_uri, k=1):
+        if k < 1:
+            raise Exception("Transition <%s> must fire at least once, got %d" % (t_uri, k))
+        return self.__fire__(t_uri, k) > 0
+
+    def fireMax(self, t_uri):
+        return self.__fire__(t_uri, None)
 
     def getArcs(self):
         return list(self.arcs)
 
+    def getWeights(self):
+        return [(src_uri, dst_uri, weight) for (src_uri, dst_uri), weight in self.__weights__.items()]
+
+    def getConflictFreeGroups(self, transitions):
+        groups = []
+        for t_uri in transitions:
+            preset = set(self.__structure__.preset[self.__tindex__[t_uri]].tolist())
+            for used, group in groups:
+                if used.isdisjoint(preset):
+                    used.update(preset)
+                    group.append(t_uri)
+                    break
+            else:
+                groups.append((preset, [t_uri]))
+        return [group for _, group in groups]
+
+    def getConflicts(self, t_uri):
+        return [self.__transitionsURIs__[t] for t in self.__structure__.conflicts[self.__tindex__[t_uri]]]
+
+    def getConsumers(self, p_uri):
+        return [self.__transitionsURIs__[t] for t in self.__structure__.consumers[self.__pindex__[p_uri]]]
+
+    def getDeadTransitions(self):
+        return [self.__transitionsURIs__[t] for t in np.flatnonzero(self.__structure__.dead)]
+
+    def getEmptiableSiphons(self, limit=None):
+        from quantica import siphons
+        return siphons.emptiableSiphons(self, limit)
+
     def getEnabledTransitions(self):
+        if not self.__profiler__ is None:
+            t0 = time.perf_counter()
         v = []
-        for uri in self.getTransitionsURIs():
-            res = self.isTransitionEnabled(uri)
-            if res == True:
+        for uri in self.__live__:
+            if self.__isEnabled__(self.__getRule__(uri)[1]):
                 v.append(uri)
         random.shuffle(v)
+        priorities = self.__getPriorities__()
+        if len(priorities) > 0:
+            v.sort(key=priorities.__getitem__, reverse=True)
+        if not self.__profiler__ is None:
+            self.__profiler__.observeEnabling(time.perf_counter() - t0, len(self.__live__))
         return v
 
+    def getProfiler(self):
+        return self.__profiler__
+
+    def getEnablingDegree(self, t_uri):
+        _, entries, live, _ = self.__getRule__(t_uri)
+        if not live:
+            return 0
+        return self.__enablingDegree__(entries)
+
+    def getKinds(self):
+        return [(src_uri, dst_uri, kind) for (src_uri, dst_uri), kind in self.__kinds__.items()]
+
     def getNode(self, uri):
-        if uri in self.getPlacesURIs():
+        if uri in self.__places__.keys():
             return self.__places__[uri]
-        if uri in self.getTransitionsURIs():
+        if uri in self.__transitions__.keys():
             return self.__transitions__[uri]
         return None
 
     def getNodeLabel(self, uri):
-        if uri in self.getPlacesURIs():
+        if uri in self.__places__.keys():
             if isinstance(self.getNode(uri), QNet):
                 return self.__subnet_URIs__[self.getNode(uri).getLabel()][uri]
             return self.__places__[uri].getLabel()
-        elif uri in self.getTransitionsURIs():
+        elif uri in self.__transitions__.keys():
             if isinstance(self.getNode(uri), QNet):
                 return self.__subnet_URIs__[self.getNode(uri).getLabel()][uri]
             return self.getNode(uri).getLabel()
         else:
             raise Exception("Requested URI does not exist")
 
+    def getPayloads(self, p_uri):
+        place = self.getNode(p_uri)
+        if isinstance(place, QPlace):
+            return place.getPayloads()
+        return place.getPayloads(self.__subnet_URIs__[place.getLabel()][p_uri])
+
     def getPlaces(self):
         return self.__places__
 
     def getPlacesURIs(self):
-        return sorted(list(self.__places__.keys()))
+        return list(self.__placesURIs__)
+
+    def getPostset(self, t_uri):
+        return [self.__placesURIs__[p] for p in self.__structure__.postset[self.__tindex__[t_uri]]]
+
+    def getPreset(self, t_uri):
+        return [self.__placesURIs__[p] for p in self.__structure__.preset[self.__tindex__[t_uri]]]
+
+    def getPriority(self, uri):
+        node, remap_uri = self.__resolve__(uri)
+        if remap_uri is None:
+            return node.priority
+        return node.getPriority(remap_uri)
+
+    def getProducers(self, p_uri):
+        return [self.__transitionsURIs__[t] for t in self.__structure__.producers[self.__pindex__[p_uri]]]
+
+    def getSiphons(self, limit=None):
+        from quantica import siphons
+        return siphons.minimalSiphons(self, limit)
 
     def getTransitions(self):
         return self.__transitions__
 
     def getTransitionsURIs(self):
-        return sorted(list(self.__transitions__.keys()))
+        return list(self.__transitionsURIs__)
 
     def getTokens(self, uri):
         place = self.getNode(uri)
@@ -415,6 +1272,36 @@ class QNet(QNode):
             return place.getTokens()
         return place.getTokens(self.__subnet_URIs__[place.getLabel()][uri])
 
+    def getTraps(self, limit=None):
+        from quantica import siphons
+        return siphons.minimalTraps(self, limit)
+
+    def ingest(self, events):
+        events = [tuple(event) for event in events]
+        for event in events:
+            if not event[0] in self.__places__.keys():
+                raise Exception("Place <%s> does not exist" % event[0])
+            if event[1] <= 0:
+                raise Exception("Events must bring at least one token, got %d for <%s>" % (event[1], event[0]))
+        self.__inbox__.extend(events)
+        return len(events)
+
+    def ingestFrom(self, source):
+        def pump():
+            inbox = self.__inbox__
+            places = self.__places__
+            for event in source:
+                if not event[0] in places.keys():
+                    logging.error("[%s] dropped event for unknown place <%s>" % (self.getLabel(), event[0]))
+                elif event[1] <= 0:
+                    logging.error("[%s] dropped event of %d token(s) for <%s>" % (self.getLabel(), event[1], event[0]))
+                else:
+                    inbox.append(event)
+        thread = threading.Thread(target=pump, daemon=True)
+        self.__sources__.append(thread)
+        thread.start()
+        return thread
+
     def isMaxLimitReached(self, uri):
         place = self.getNode(uri)
         if isinstance(place, QPlace):
@@ -422,37 +1309,10 @@ class QNet(QNode):
         return place.isMaxLimitReached(self.__subnet_URIs__[place.getLabel()][uri])
 
     def isTransitionEnabled(self, t_uri):
-        I_column_sum = 0
-        O_column_sum = 0
-
-        for p_uri in self.getPlacesURIs():
-            I_column_sum += self.weight(p_uri, t_uri)
-            O_column_sum += self.weight(t_uri, p_uri)
-
-        if I_column_sum == 0:
+        _, entries, live, _ = self.__getRule__(t_uri)
+        if not live:
             return False
-        if O_column_sum == 0:
-            return False
-
-        enabled = True
-        for p_uri in self.getPlacesURIs():
-            place = self.getNode(p_uri)
-            if isinstance(place, QPlace):
-                if place.isWorking() and (self.weight(t_uri, p_uri) > 0 or self.weight(p_uri, t_uri) > 0):
-                    return False
-                if place.isMaxLimitReached() and self.weight(t_uri, p_uri) > 0:
-                    return False
-                if place.getTokens() < self.weight(p_uri, t_uri):
-                    enabled = False
-            else:
-                remap_puri = self.__subnet_URIs__[place.getLabel()][p_uri]
-                if place.isWorking(remap_puri) and (self.weight(t_uri, p_uri) > 0 or self.weight(p_uri, t_uri) > 0):
-                    return False
-                if place.isMaxLimitReached(remap_puri) and self.weight(t_uri, p_uri) > 0:
-                    return False
-                if place.getTokens(remap_puri) < self.weight(p_uri, t_uri):
-                    enabled = False
-        return enabled
+        return self.__isEnabled__(entries)
 
     def isWorking(self, p_uri):
         place = self.getNode(p_uri)
@@ -460,56 +1320,226 @@ class QNet(QNode):
             return place.isWorking()
         return place.isWorking(self.__subnet_URIs__[place.getLabel()][p_uri])
 
+    def kind(self, src_uri, dst_uri):
+        if not (src_uri, dst_uri) in self.__weights__:
+            return None
+        return self.__kinds__.get((src_uri, dst_uri), ARC_NORMAL)
+
+    @classmethod
+    def load(cls, path, tasks=None, address=None, logging_level=logging.DEBUG):
+        data = np.load(__npzpath__(path), allow_pickle=False)
+        if int(data['version']) != NET_FORMAT_VERSION:
+            raise Exception("Unsupported QNet file version %d" % int(data['version']))
+        if tasks is None:
+            tasks = {}
+        places = data['places'].tolist()
+        transitions = data['transitions'].tolist()
+        net = QNet(str(data['label']), address=address, logging_level=logging_level)
+        with net.batch():
+            settings = zip(places, data['init_tokens'].tolist(), data['tokens'].tolist(), data['max_tokens'].tolist(),
+                           data['batched'].tolist(), data['batch_size'].tolist(), data['linger_ms'].tolist(),
+                           data['colored'].tolist(), data['place_priorities'].tolist())
+            for uri, init_tokens, tokens, max_tokens, batched, batch_size, linger_ms, colored, priority in settings:
+                place = QPlace(uri, init_tokens, target_task=tasks.get(uri, None),
+                               max_tokens_allowed=None if max_tokens < 0 else max_tokens, store=net.__store__,
+                               batched=batched, batch_size=None if batch_size < 0 else batch_size, linger_ms=linger_ms,
+                               colored=colored, priority=priority)
+                place.setTokens(tokens)
+                net.__places__[uri] = place
+            for uri, priority in zip(transitions, data['transition_priorities'].tolist()):
+                net.__transitions__[uri] = QTransition(uri, priority)
+            inputs = data['inputs']
+            outputs = data['outputs']
+            net.__weights__.update(zip(zip([places[p] for p in inputs[0]], [transitions[t] for t in inputs[1]]),
+                                       inputs[2].tolist()))
+            net.__weights__.update(zip(zip([transitions[t] for t in outputs[0]], [places[p] for p in outputs[1]]),
+                                       outputs[2].tolist()))
+            for kind, name in ((ARC_INHIBITOR, 'inhibitors'), (ARC_RESET, 'resets')):
+                arcs = list(zip([places[p] for p in data[name][0]], [transitions[t] for t in data[name][1]]))
+                net.__weights__.update(zip(arcs, data[name][2].tolist()))
+                net.__kinds__.update((arc, kind) for arc in arcs)
+        return net
+
     def next_until_end(self):
         for _ in self:
             pass
 
     def pendingTasks(self):
-        for p_uri in self.getPlacesURIs():
-            if self.isWorking(p_uri):
+        if not self.__executor__ is None and self.__executor__.pending() > 0:
+            return True
+        for p_uri in self.__placesURIs__:
+            node, remap_uri = self.__resolve__(p_uri)
+            if remap_uri is None:
+                if node.isWorking() or node.isDraining():
+                    return True
+            elif node.isWorking(remap_uri):
                 return True
         return False
 
-    def produce(self, p_uri, weight):
+    def produce(self, p_uri, weight, payloads=None):
         place = self.__places__[p_uri]
+        if not self.__trace__ is None:
+            self.__trace__.recordTokens(self.__pindex__[p_uri], weight)
         if isinstance(place, QPlace):
-            place.produce(weight)
-        else:
+            place.produce(weight, payloads)
+        elif payloads is None:
             place.produce(self.__subnet_URIs__[place.getLabel()][p_uri], weight)
+        else:
+            place.produce(self.__subnet_URIs__[place.getLabel()][p_uri], weight, payloads)
 
     def reset(self):
+        x0 = None if self.__trace__ is None else self.__refresh__().copy()
         for place in self.__places__.values():
             place.reset()
-
-    def start_async(self):
-        v = []
+        if not x0 is None:
+            self.__traceMarking__(x0)
+        if not self.__shared__ is None:
+            self.__shared__.publish()
+
+    def restore(self, path):
+        from quantica import checkpoint
+        x0 = None if self.__trace__ is None else self.__refresh__().copy()
+        seq = checkpoint.restore(self, path)
+        if not x0 is None:
+            self.__traceMarking__(x0)
+        if not self.__shared__ is None:
+            self.__shared__.publish()
+        return seq
+
+    def save(self, path):
+        places = []
+        for uri in self.__placesURIs__:
+            place, remap_uri = self.__resolve__(uri)
+            if not remap_uri is None:
+                raise Exception("Place <%s> belongs to a remote QNet and cannot be saved" % uri)
+            places.append(place)
+        shape = (self.nplaces, self.ntransitions)
+        I, O = (M.reshape(shape) for M in (self.I, self.O))
+        inputs = np.nonzero(I)
+        outputs = np.nonzero(O)
+        np.savez(__npzpath__(path),
+                 version=NET_FORMAT_VERSION,
+                 label=self.getLabel(),
+                 places=np.array(self.__placesURIs__, dtype=str),
+                 transitions=np.array(self.__transitionsURIs__, dtype=str),
+                 init_tokens=np.array([p.init_tokens for p in places], dtype=np.int64),
+                 tokens=np.array([p.getTokens() for p in places], dtype=np.int64),
+                 max_tokens=np.array([-1 if p.max_tokens_allowed is None else p.max_tokens_allowed for p in places],
+                                     dtype=np.int64),
+                 batched=np.array([p.batched for p in places], dtype=bool),
+                 batch_size=np.array([-1 if p.batch_size is None else p.batch_size for p in places], dtype=np.int64),
+                 linger_ms=np.array([p.linger_ms for p in places], dtype=np.float64),
+                 colored=np.array([p.colored for p in places], dtype=bool),
+                 place_priorities=np.array([p.priority for p in places], dtype=np.int64),
+                 transition_priorities=np.array([self.getPriority(uri) for uri in self.__transitionsURIs__],
+                                                dtype=np.int64),
+                 inputs=np.array([inputs[0], inputs[1], I[inputs]], dtype=np.int64).reshape(3, -1),
+                 outputs=np.array([outputs[1], outputs[0], O[outputs]], dtype=np.int64).reshape(3, -1),
+                 inhibitors=np.array(self.__arcIndices__(ARC_INHIBITOR), dtype=np.int64).reshape(3, -1),
+                 resets=np.array(self.__arcIndices__(ARC_RESET), dtype=np.int64).reshape(3, -1))
+
+    def setBulkFiring(self, bulk=True):
+        self.__bulk__ = bulk
+
+    def setPriority(self, uri, priority):
+        node, remap_uri = self.__resolve__(uri)
+        if remap_uri is None:
+            node.setPriority(priority)
+        else:
+            node.setPriority(remap_uri, priority)
+        self.__priorities__ = None
+
+    def setTaskExecutor(self, max_workers=None):
+        from quantica.executor import QTaskExecutor
+        if not self.__executor__ is None:
+            self.__executor__.shutdown(wait=False)
+        self.__executor__ = None if max_workers is None else QTaskExecutor(max_workers)
+        for uri in self.__placesURIs__:
+            node, remap_uri = self.__resolve__(uri)
+            if remap_uri is None:
+                node.setExecutor(self.__executor__)
+        return self.__executor__
+
+    def shareMarking(self, name=None):
+        from quantica.sharedmem import QSharedMarking
+        self.unshareMarking()
+        self.__shared__ = QSharedMarking(self, name=name)
+        return self.__shared__
+
+    def start_async(self, workers=None):
+        if not workers is None:
+            return self.__startParallel__(workers)
         while True:
+            if not self.__checkpointer__ is None:
+                self.__checkpointer__.maybe()
             try:
                 self.__next__()
             except:
-                if not self.pendingTasks():
+                if not self.__busy__():
                     break
-            time.sleep(0.0001)
+            self.__idle__()
+
+    def startRecording(self, capacity=65536, path=None):
+        if ARC_RESET in self.__kinds__.values():
+            raise Exception("QNet <%s> has reset arcs: its markings cannot be rebuilt from a trace" % self.getLabel())
+        from quantica.trace import QTrace
+        self.__trace__ = QTrace.fromNet(self, capacity=capacity, path=path)
+        return self.__trace__
+
+    def stopRecording(self):
+        trace = self.__trace__
+        self.__trace__ = None
+        if not trace is None:
+            trace.close()
+        return trace
+
+    def unshareMarking(self):
+        if not self.__shared__ is None:
+            self.__shared__.close()
+            self.__shared__ = None
+
+    def formatState(self, x=None):
+        if x is None:
+            x = self.__refresh__()
+        return ["%s=%d" % (uri, tokens) for uri, tokens in zip(self.__placesURIs__, x)]
+
+    def marking(self):
+        self.__refresh__()
+        return self.__xview__
+
+    def setStructuredState(self, structured=True):
+        self.__structured__ = structured
 
     def state(self):
-        state = []
-        for uri in self.getPlacesURIs():
-            tokens = self.getTokens(uri)
-            state.append("%s=%d" % (uri, tokens))
-        return state
+        return self.formatState(self.__refresh__())
 
     def weight(self, src_uri, dst_uri):
-        if (src_uri, dst_uri) in self.__weights__.keys():
-            return self.__weights__[(src_uri, dst_uri)]
-        return 0
+        return self.__weights__.get((src_uri, dst_uri), 0)
 
 class QNetRemote:
 
     def __init__(self, address):
+        from quantica import rpc
         self._address = address
-        self._server = xmlrpc.client.ServerProxy("http://%s:%d" % (address[0], address[1]))
+        self._server = rpc.proxy(address)
         self._server_acquired = threading.Event()
+        self._profiler = None
 
     def __getattr__(self, name: str):
-        with xmlrpc.client.ServerProxy("http://%s:%d" % (self._address[0], self._address[1])) as proxy:
-            return proxy.__getattr__(name)
+        from quantica import rpc
+        with rpc.proxy(self._address) as proxy:
+            method = proxy.__getattr__(name)
+        profiler = self._profiler
+        if profiler is None:
+            return method
+
+        def timed(*args):
+            t0 = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                profiler.observeRPC(name, time.perf_counter() - t0)
+        return timed
+
+    def setProfiler(self, profiler):
+        self._profiler = profiler
@@ -28,7 +28,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 https://en.wikipedia.org/wiki/Logic_gate
 """
 
-from quantica.core import QPlace, QNet, QTransition
+from quantica.core import QPlace, QNet, QTransition, ARC_INHIBITOR
 import threading
 import logging
 
@@ -123,24 +123,9 @@ class QNOT(QGate):
         p3 = self.qnet.createPlace(init_tokens=1)
         t1 = self.qnet.createTransition()
         self.qnet.connect(p3, t1, 1)
+        self.qnet.connect(self.pA, t1, 1, ARC_INHIBITOR)
         self.qnet.connect(t1, self.pQ, 1)
 
-        p4 = self.qnet.createPlace()
-        t2 = self.qnet.createTransition()
-        self.qnet.connect(p4, t2, 1)
-        self.qnet.connect(t2, p4, 1)
-        self.qnet.connect(t2, self.pQ, 1)
-
-
-        t3 = self.qnet.createTransition()
-        self.qnet.connect(self.pA, t3, 1)
-        self.qnet.connect(t3, self.pA, 1)
-        self.qnet.connect(self.pQ, t3, 1)
-
-        p5 = self.qnet.createPlace()
-        self.qnet.connect(t3, p5, 1)
-        self.qnet.connect(p5, t2, 1)
-
 
 class QNAND(QGate):
 
@@ -149,29 +134,10 @@ class QNAND(QGate):
         p3 = self.qnet.createPlace(init_tokens=1)
         t1 = self.qnet.createTransition()
         self.qnet.connect(p3, t1, 1)
+        self.qnet.connect(self.pA, t1, 1, ARC_INHIBITOR)
         self.qnet.connect(t1, self.pQ, 1)
 
-        p4 = self.qnet.createPlace()
         t2 = self.qnet.createTransition()
-        self.qnet.connect(p4, t2, 1)
-        self.qnet.connect(t2, p4, 1)
+        self.qnet.connect(p3, t2, 1)
+        self.qnet.connect(self.pB, t2, 1, ARC_INHIBITOR)
         self.qnet.connect(t2, self.pQ, 1)
-
-        p5 = self.qnet.createPlace()
-        t3 = self.qnet.createTransition()
-        self.qnet.connect(p5, t3, 1)
-        self.qnet.connect(t3, p5, 1)
-        self.qnet.connect(t3, self.pQ, 1)
-
-        p6 = self.qnet.createPlace()
-        self.qnet.connect(p6, t2, 1)
-        self.qnet.connect(p6, t3, 1)
-
-        t4 = self.qnet.createTransition()
-        self.qnet.connect(t4, p6, 1)
-        self.qnet.connect(self.pQ, t4, 1)
-
-        self.qnet.connect(t4, self.pA, 1)
-        self.qnet.connect(self.pA, t4, 1)
-        self.qnet.connect(t4, self.pB, 1)
-        self.qnet.connect(self.pB, t4, 1)
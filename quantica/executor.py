@@ -0,0 +1,99 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Bounded executor for place tasks. Tasks wait in a heap ordered by the priority
+of their place, higher first and in submission order among equals, and run on
+at most `max_workers` threads started on demand, so that latency-critical
+places are served before bulk ones when the net is under load.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+
+class QTaskExecutor(object):
+
+    def __init__(self, max_workers):
+        if max_workers < 1:
+            raise Exception("A QTaskExecutor needs at least one worker, got %d" % max_workers)
+        self.__max_workers__ = max_workers
+        self.__heap__ = []
+        self.__counter__ = itertools.count()
+        self.__condition__ = threading.Condition()
+        self.__threads__ = []
+        self.__idle__ = 0
+        self.__running__ = 0
+        self.__closed__ = False
+
+    @property
+    def max_workers(self):
+        return self.__max_workers__
+
+    def __work__(self):
+        while True:
+            with self.__condition__:
+                while len(self.__heap__) == 0 and not self.__closed__:
+                    self.__idle__ += 1
+                    self.__condition__.wait()
+                if len(self.__heap__) == 0:
+                    return
+                _, _, target, args = heapq.heappop(self.__heap__)
+                self.__running__ += 1
+            try:
+                target(*args)
+            except Exception:
+                logging.exception("Task %r failed" % target)
+            finally:
+                with self.__condition__:
+                    self.__running__ -= 1
+
+    def pending(self):
+        with self.__condition__:
+            return len(self.__heap__) + self.__running__
+
+    def shutdown(self, wait=True):
+        with self.__condition__:
+            self.__closed__ = True
+            self.__condition__.notify_all()
+        if wait:
+            for thread in self.__threads__:
+                if thread != threading.current_thread():
+                    thread.join()
+
+    def submit(self, priority, target, args=()):
+        with self.__condition__:
+            if self.__closed__:
+                raise Exception("QTaskExecutor is shut down")
+            heapq.heappush(self.__heap__, (-priority, next(self.__counter__), target, args))
+            if self.__idle__ > 0:
+                self.__idle__ -= 1
+                self.__condition__.notify()
+            elif len(self.__threads__) < self.__max_workers__:
+                thread = threading.Thread(target=self.__work__, daemon=True)
+                self.__threads__.append(thread)
+                thread.start()
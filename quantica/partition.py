@@ -0,0 +1,295 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Partitioned execution of a QNet across local processes. The net is cut along
+places so that every place lives in the same partition as the transitions
+consuming from it, and as the ones producing into it when it has a capacity or
+a task: enabling and firing stay local and only produced tokens cross
+partitions, through multiprocessing queues.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import queue
+import time
+
+from quantica.core import QNet, QPlace, QTransition
+
+class QPartition(object):
+
+    def __init__(self, index, label):
+        self.index = index
+        self.label = label
+        self.places = []
+        self.transitions = []
+        self.arcs = []
+        self.exports = {}
+        self.colored = set()
+
+    def __repr__(self):
+        return "QPartition(%d, places=%d, transitions=%d, exports=%d)" % (
+            self.index, len(self.places), len(self.transitions), len(self.exports))
+
+    def build(self, logging_level=logging.WARNING):
+        net = QNet(self.label, logging_level=logging_level)
+        with net.batch():
+            for uri, tokens, target_task, max_tokens_allowed, batching, priority, colored in self.places:
+                place = QPlace(uri, tokens, target_task=target_task, max_tokens_allowed=max_tokens_allowed, store=net.__store__,
+                               batched=batching[0], batch_size=batching[1], linger_ms=batching[2], priority=priority,
+                               colored=colored)
+                net.addNode(place, uri)
+            for uri in self.exports.keys():
+                net.addNode(QPlace(uri, store=net.__store__, colored=uri in self.colored), uri)
+            for uri, priority in self.transitions:
+                net.addNode(QTransition(uri, priority), uri)
+            for src_uri, dst_uri, weight, kind in self.arcs:
+                net.connect(src_uri, dst_uri, weight, kind)
+        return net
+
+class QUnionFind(object):
+
+    def __init__(self, n):
+        self.__parent__ = list(range(n))
+
+    def find(self, i):
+        while self.__parent__[i] != i:
+            self.__parent__[i] = self.__parent__[self.__parent__[i]]
+            i = self.__parent__[i]
+        return i
+
+    def union(self, i, j):
+        self.__parent__[self.find(i)] = self.find(j)
+
+def partition(net, n, passes=2):
+    net = net.flatten()
+    places = net.getPlacesURIs()
+    transitions = net.getTransitionsURIs()
+    nodes = places + transitions
+    index = {uri: i for i, uri in enumerate(nodes)}
+    arcs = net.getWeights()
+
+    for uri in places:
+        if not isinstance(net.getNode(uri), QPlace):
+            raise Exception("Place <%s> belongs to a remote QNet and cannot be partitioned" % uri)
+
+    # A place lives with all the transitions consuming from it, so that
+    # enabling and firing never need a remote place: only produced tokens
+    # cross partitions. A place with a capacity or a task also lives with the
+    # transitions producing into it, which must see its tokens and its
+    # working state before firing.
+    units = QUnionFind(len(nodes))
+    for src_uri, dst_uri, _ in arcs:
+        if src_uri in net.getPlaces().keys():
+            units.union(index[src_uri], index[dst_uri])
+        else:
+            place = net.getNode(dst_uri)
+            if not (place.max_tokens_allowed is None and place.target_task is None):
+                units.union(index[src_uri], index[dst_uri])
+
+    members = {}
+    for i in range(len(nodes)):
+        members.setdefault(units.find(i), []).append(i)
+    unit_of = {i: u for u, nodes_u in members.items() for i in nodes_u}
+
+    links = {u: {} for u in members.keys()}
+    for src_uri, dst_uri, _ in arcs:
+        u, v = unit_of[index[src_uri]], unit_of[index[dst_uri]]
+        if u != v:
+            links[u][v] = links[u].get(v, 0) + 1
+            links[v][u] = links[v].get(u, 0) + 1
+
+    # Greedy graph growing: each partition starts from the largest free unit
+    # and absorbs the free unit most connected to it until it is full.
+    n = max(1, min(n, len(members)))
+    capacity = -(-len(nodes) // n)
+    assignment = {}
+    loads = [0] * n
+    free = sorted(members.keys(), key=lambda u: -len(members[u]))
+    for current in range(n):
+        gains = {}
+        heap = []
+        while loads[current] < capacity or current == n - 1:
+            u = None
+            while len(heap) > 0:
+                gain, v = heapq.heappop(heap)
+                if not v in assignment and -gain == gains[v]:
+                    u = v
+                    break
+            if u is None:
+                while len(free) > 0 and free[0] in assignment:
+                    free.pop(0)
+                if len(free) == 0:
+                    break
+                u = free[0]
+            if loads[current] > 0 and loads[current] + len(members[u]) > capacity and current < n - 1:
+                break
+            assignment[u] = current
+            loads[current] += len(members[u])
+            for v, w in links[u].items():
+                if not v in assignment:
+                    gains[v] = gains.get(v, 0) + w
+                    heapq.heappush(heap, (-gains[v], v))
+
+    # Refinement: move a unit to the partition it is most connected to when
+    # this lowers the number of boundary arcs and keeps the load balanced.
+    limit = int(capacity * 1.1) + 1
+    for _ in range(passes):
+        moved = False
+        for u in members.keys():
+            gains = {}
+            for v, w in links[u].items():
+                gains[assignment[v]] = gains.get(assignment[v], 0) + w
+            best = max(gains.keys(), key=lambda k: gains[k], default=assignment[u])
+            if best != assignment[u] and gains[best] > gains.get(assignment[u], 0) \
+                    and loads[best] + len(members[u]) <= limit:
+                loads[assignment[u]] -= len(members[u])
+                loads[best] += len(members[u])
+                assignment[u] = best
+                moved = True
+        if not moved:
+            break
+
+    parts = [QPartition(i, "%s.%d" % (net.getLabel(), i)) for i in range(n)]
+    owner = {}
+    for i, uri in enumerate(nodes):
+        part = parts[assignment[unit_of[i]]]
+        owner[uri] = part.index
+        if uri in net.getPlaces().keys():
+            place = net.getNode(uri)
+            part.places.append((uri, place.getTokens(), place.target_task, place.max_tokens_allowed,
+                                (place.batched, place.batch_size, place.linger_ms), place.priority, place.colored))
+        else:
+            part.transitions.append((uri, net.getPriority(uri)))
+
+    for src_uri, dst_uri, weight in arcs:
+        part = parts[owner[src_uri]]
+        part.arcs.append((src_uri, dst_uri, weight, net.kind(src_uri, dst_uri)))
+        if owner[dst_uri] != part.index:
+            part.exports[dst_uri] = owner[dst_uri]
+            if net.getNode(dst_uri).colored:
+                part.colored.add(dst_uri)
+    return [part for part in parts if len(part.places) + len(part.transitions) > 0]
+
+def cut(partitions):
+    return sum(1 for part in partitions for src_uri, dst_uri, _, _ in part.arcs if dst_uri in part.exports)
+
+def __worker__(part, inboxes, control, logging_level):
+    net = part.build(logging_level)
+    inbox = inboxes[part.index]
+    sent = 0
+    received = 0
+    idle = False
+    reported = None
+    while True:
+        try:
+            message = inbox.get(block=idle, timeout=0.01)
+        except queue.Empty:
+            message = None
+        while not message is None:
+            if message[0] == 'stop':
+                marking = [(place[0], net.getTokens(place[0])) for place in part.places]
+                control.put(('marking', part.index, marking))
+                return
+            net.produce(message[1], message[2], message[3])
+            received += 1
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                message = None
+
+        fired = False
+        for t_uri in net.getEnabledTransitions():
+            fired = net.fire(t_uri) or fired
+        for p_uri, index in part.exports.items():
+            tokens = net.getTokens(p_uri)
+            if tokens > 0:
+                payloads = net.consume(p_uri, -tokens)
+                inboxes[index].put(('tokens', p_uri, tokens, payloads))
+                sent += 1
+
+        idle = not (fired or net.pendingTasks())
+        if reported != (idle, sent, received):
+            reported = (idle, sent, received)
+            control.put(('status', part.index, idle, sent, received))
+
+class QPartitionedNet(object):
+
+    def __init__(self, net, nprocs=None, logging_level=logging.WARNING):
+        if nprocs is None:
+            nprocs = multiprocessing.cpu_count()
+        self.__net__ = net
+        self.__partitions__ = partition(net, nprocs)
+        self.__logging_level__ = logging_level
+
+    @property
+    def cut(self):
+        return cut(self.__partitions__)
+
+    @property
+    def partitions(self):
+        return list(self.__partitions__)
+
+    def start_async(self, timeout=None):
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        inboxes = [context.Queue() for _ in self.__partitions__]
+        control = context.Queue()
+        workers = [context.Process(target=__worker__, args=(part, inboxes, control, self.__logging_level__), daemon=True)
+                   for part in self.__partitions__]
+        for worker in workers:
+            worker.start()
+
+        status = {part.index: (False, 0, 0) for part in self.__partitions__}
+        t0 = time.perf_counter()
+        while True:
+            if not timeout is None and time.perf_counter() - t0 > timeout:
+                break
+            try:
+                message = control.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            _, index, idle, sent, received = message
+            status[index] = (idle, sent, received)
+            if all(s[0] for s in status.values()) and \
+                    sum(s[1] for s in status.values()) == sum(s[2] for s in status.values()):
+                break
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        marking = {}
+        for _ in workers:
+            message = control.get()
+            while message[0] != 'marking':
+                message = control.get()
+            marking.update(message[2])
+        for worker in workers:
+            worker.join()
+
+        for uri, tokens in marking.items():
+            self.__net__.__resolve__(uri)[0].setTokens(tokens)
+        return marking
@@ -0,0 +1,144 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+PNML import and export of place/transition nets. Files are read with an
+incremental iterparse-based reader, parsed elements are discarded as soon as
+they are consumed and the net is built in a single batch. Inhibitor and reset
+arcs are marked with a <type value="..."/> child, as done by PIPE.
+
+https://www.pnml.org
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from quantica.core import ARC_NORMAL, QNet, QPlace, QTransition
+
+PNML_NAMESPACE = 'http://www.pnml.org/version-2009/grammar/pnml'
+PTNET_TYPE = 'http://www.pnml.org/version-2009/grammar/ptnet'
+
+def __tag__(elem):
+    return elem.tag.rsplit('}', 1)[-1]
+
+def __text__(elem, name, default=None):
+    for child in elem:
+        if __tag__(child) == name:
+            for text in child:
+                if __tag__(text) == 'text' and not text.text is None:
+                    return text.text.strip()
+    return default
+
+def __kind__(elem):
+    for child in elem:
+        if __tag__(child) == 'type':
+            return child.get('value', ARC_NORMAL)
+    return ARC_NORMAL
+
+def __parse__(path, net_id=None):
+    stack = []
+    depth = None
+    named = False
+    with open(path, 'rb') as source:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            tag = __tag__(elem)
+            if event == 'start':
+                stack.append(elem)
+                if tag == 'net' and depth is None and (net_id is None or elem.get('id') == net_id):
+                    depth = len(stack)
+                continue
+
+            stack.pop()
+            if tag in ('place', 'transition', 'arc') and len(stack) > 0:
+                stack[-1].remove(elem)
+            if depth is None or len(stack) < depth - 1:
+                continue
+            if len(stack) == depth - 1:
+                if not named:
+                    yield 'net', elem.get('id'), __text__(elem, 'name')
+                return
+            if not named and (tag in ('place', 'transition', 'arc') or (tag == 'name' and len(stack) == depth)):
+                named = True
+                yield 'net', stack[depth - 1].get('id'), __text__(stack[depth - 1], 'name')
+            if tag == 'place':
+                yield 'place', elem.get('id'), int(__text__(elem, 'initialMarking', 0))
+            elif tag == 'transition':
+                yield 'transition', elem.get('id')
+            elif tag == 'arc':
+                yield 'arc', elem.get('source'), elem.get('target'), int(__text__(elem, 'inscription', 1)), __kind__(elem)
+
+def load(path, label=None, net_id=None, logging_level=logging.DEBUG):
+    records = __parse__(path, net_id)
+    net = None
+    for record in records:
+        if record[0] == 'net':
+            if label is None:
+                label = record[1] if record[2] is None else record[2]
+            net = QNet(label, logging_level=logging_level)
+            break
+    if net is None:
+        raise Exception("No PNML net found in <%s>" % path)
+
+    arcs = []
+    with net.batch():
+        for record in records:
+            if record[0] == 'place':
+                net.addNode(QPlace(record[1], record[2], store=net.__store__), record[1])
+            elif record[0] == 'transition':
+                net.addNode(QTransition(record[1]), record[1])
+            else:
+                arcs.append(record[1:])
+        for src_uri, dst_uri, weight, kind in arcs:
+            net.connect(src_uri, dst_uri, weight, kind)
+    return net
+
+def dump(net, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<pnml xmlns=%s>\n' % quoteattr(PNML_NAMESPACE))
+        f.write('  <net id=%s type=%s>\n' % (quoteattr(net.getLabel()), quoteattr(PTNET_TYPE)))
+        f.write('    <name><text>%s</text></name>\n' % escape(net.getLabel()))
+        f.write('    <page id="page0">\n')
+        for uri in net.getPlacesURIs():
+            f.write('      <place id=%s><name><text>%s</text></name>' % (quoteattr(uri), escape(uri)))
+            tokens = net.getTokens(uri)
+            if tokens != 0:
+                f.write('<initialMarking><text>%d</text></initialMarking>' % tokens)
+            f.write('</place>\n')
+        for uri in net.getTransitionsURIs():
+            f.write('      <transition id=%s><name><text>%s</text></name></transition>\n' % (quoteattr(uri), escape(uri)))
+        for i, (src_uri, dst_uri, weight) in enumerate(sorted(net.getWeights())):
+            f.write('      <arc id="a%d" source=%s target=%s>' % (i, quoteattr(src_uri), quoteattr(dst_uri)))
+            if weight != 1:
+                f.write('<inscription><text>%d</text></inscription>' % weight)
+            kind = net.kind(src_uri, dst_uri)
+            if kind != ARC_NORMAL:
+                f.write('<type value=%s/>' % quoteattr(kind))
+            f.write('</arc>\n')
+        f.write('    </page>\n')
+        f.write('  </net>\n')
+        f.write('</pnml>\n')
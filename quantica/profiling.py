@@ -0,0 +1,163 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Opt-in instrumentation of QNet runs. A QProfiler attached with
+QNet.enableProfiling() collects firing counts, enabling check time, place task
+latencies, scheduler idle time and remote call timings.
+"""
+
+import threading
+import time
+
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+class QHistogram(object):
+
+    def __init__(self, buckets=BUCKETS):
+        self.__buckets__ = tuple(buckets)
+        self.__counts__ = [0] * (len(self.__buckets__) + 1)
+        self.__sum__ = 0.0
+        self.__count__ = 0
+
+    @property
+    def count(self):
+        return self.__count__
+
+    @property
+    def sum(self):
+        return self.__sum__
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.__buckets__) and value > self.__buckets__[i]:
+            i += 1
+        self.__counts__[i] += 1
+        self.__sum__ += value
+        self.__count__ += 1
+
+    def snapshot(self):
+        cumulative = []
+        total = 0
+        for bound, n in zip(self.__buckets__, self.__counts__):
+            total += n
+            cumulative.append((bound, total))
+        cumulative.append((float('inf'), self.__count__))
+        return {'count': self.__count__, 'sum': self.__sum__, 'buckets': cumulative}
+
+class QProfiler(object):
+
+    def __init__(self, label='quantica'):
+        self.__label__ = label
+        self.__lock__ = threading.Lock()
+        self.reset()
+
+    def __histogram__(self, table, key):
+        h = table.get(key, None)
+        if h is None:
+            h = QHistogram()
+            table[key] = h
+        return h
+
+    def countFiring(self, t_uri, n=1):
+        with self.__lock__:
+            self.__firings__[t_uri] = self.__firings__.get(t_uri, 0) + n
+
+    def observeEnabling(self, duration, nchecks):
+        with self.__lock__:
+            self.__enabling_checks__ += nchecks
+            self.__enabling_time__ += duration
+
+    def observeIdle(self, duration):
+        with self.__lock__:
+            self.__idle_time__ += duration
+
+    def observeRPC(self, method, duration):
+        with self.__lock__:
+            self.__histogram__(self.__rpc__, method).observe(duration)
+
+    def observeTaskRun(self, p_uri, duration):
+        with self.__lock__:
+            self.__histogram__(self.__task_run__, p_uri).observe(duration)
+
+    def observeTaskWait(self, p_uri, duration):
+        with self.__lock__:
+            self.__histogram__(self.__task_wait__, p_uri).observe(duration)
+
+    def reset(self):
+        with self.__lock__:
+            self.__started__ = time.perf_counter()
+            self.__firings__ = {}
+            self.__enabling_checks__ = 0
+            self.__enabling_time__ = 0.0
+            self.__idle_time__ = 0.0
+            self.__task_wait__ = {}
+            self.__task_run__ = {}
+            self.__rpc__ = {}
+
+    def snapshot(self):
+        with self.__lock__:
+            elapsed = time.perf_counter() - self.__started__
+            return {
+                'label': self.__label__,
+                'elapsed': elapsed,
+                'firings': dict(self.__firings__),
+                'firing_rates': {k: v / elapsed for k, v in self.__firings__.items()} if elapsed > 0 else {},
+                'enabling_checks': self.__enabling_checks__,
+                'enabling_time': self.__enabling_time__,
+                'idle_time': self.__idle_time__,
+                'task_wait': {k: h.snapshot() for k, h in self.__task_wait__.items()},
+                'task_run': {k: h.snapshot() for k, h in self.__task_run__.items()},
+                'rpc': {k: h.snapshot() for k, h in self.__rpc__.items()}
+            }
+
+    def prometheus(self):
+        snap = self.snapshot()
+        net = snap['label']
+        lines = []
+
+        lines.append('# TYPE quantica_transition_firings_total counter')
+        for t_uri, n in sorted(snap['firings'].items()):
+            lines.append('quantica_transition_firings_total{net="%s",transition="%s"} %d' % (net, t_uri, n))
+
+        lines.append('# TYPE quantica_enabling_checks_total counter')
+        lines.append('quantica_enabling_checks_total{net="%s"} %d' % (net, snap['enabling_checks']))
+        lines.append('# TYPE quantica_enabling_seconds_total counter')
+        lines.append('quantica_enabling_seconds_total{net="%s"} %f' % (net, snap['enabling_time']))
+        lines.append('# TYPE quantica_scheduler_idle_seconds_total counter')
+        lines.append('quantica_scheduler_idle_seconds_total{net="%s"} %f' % (net, snap['idle_time']))
+
+        for name, key, label in (('quantica_task_wait_seconds', 'task_wait', 'place'),
+                                 ('quantica_task_run_seconds', 'task_run', 'place'),
+                                 ('quantica_rpc_seconds', 'rpc', 'method')):
+            lines.append('# TYPE %s histogram' % name)
+            for k, h in sorted(snap[key].items()):
+                for bound, n in h['buckets']:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('%s_bucket{net="%s",%s="%s",le="%s"} %d' % (name, net, label, k, le, n))
+                lines.append('%s_sum{net="%s",%s="%s"} %f' % (name, net, label, k, h['sum']))
+                lines.append('%s_count{net="%s",%s="%s"} %d' % (name, net, label, k, h['count']))
+        return '\n'.join(lines) + '\n'
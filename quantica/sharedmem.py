@@ -0,0 +1,205 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Shared-memory marking of a QNet. The marking vector and the working and
+capacity flags of every place are published in a multiprocessing.shared_memory
+block guarded by a seqlock-style version counter, so that local processes can
+read consistent snapshots without going through the XML-RPC server.
+"""
+
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x514e4554
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', '<u4'), ('version', '<u4'), ('seq', '<u8'), ('nplaces', '<u8'), ('uris', '<u8')])
+
+# Blocks created by this process: the resource tracker already tracks them once.
+__created__ = set()
+
+def __layout__(nplaces):
+    tokens = HEADER_DTYPE.itemsize
+    working = tokens + 8 * nplaces
+    capacity = working + nplaces
+    uris = capacity + nplaces
+    return tokens, working, capacity, uris
+
+class QSharedBlock(object):
+
+    def __init__(self, shm, nplaces, readonly):
+        self.__shm__ = shm
+        tokens, working, capacity, _ = __layout__(nplaces)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        self.tokens = np.ndarray((nplaces,), dtype=np.int64, buffer=shm.buf, offset=tokens)
+        self.working = np.ndarray((nplaces,), dtype=np.bool_, buffer=shm.buf, offset=working)
+        self.capacity = np.ndarray((nplaces,), dtype=np.bool_, buffer=shm.buf, offset=capacity)
+        if readonly:
+            for a in (self.tokens, self.working, self.capacity):
+                a.flags.writeable = False
+
+    @property
+    def name(self):
+        return self.__shm__.name
+
+    @property
+    def seq(self):
+        return int(self.header['seq'])
+
+    def close(self, unlink=False):
+        del self.header, self.tokens, self.working, self.capacity
+        self.__shm__.close()
+        if unlink:
+            __created__.discard(self.__shm__.name)
+            self.__shm__.unlink()
+
+class QSharedMarking(object):
+
+    def __init__(self, net, name=None):
+        self.__net__ = net
+        self.__places__ = net.getPlacesURIs()
+        nplaces = len(self.__places__)
+        uris = '\n'.join(self.__places__).encode('utf-8')
+        size = __layout__(nplaces)[3] + len(uris)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        __created__.add(shm.name)
+        shm.buf[__layout__(nplaces)[3]:size] = uris
+        self.__block__ = QSharedBlock(shm, nplaces, readonly=False)
+        self.__block__.header['magic'] = MAGIC
+        self.__block__.header['version'] = VERSION
+        self.__block__.header['nplaces'] = nplaces
+        self.__block__.header['uris'] = len(uris)
+        self.__lock__ = threading.Lock()
+        self.__published__ = 0.0
+
+        self.__tasks__ = []
+        self.__limits__ = []
+        for i, uri in enumerate(self.__places__):
+            node, remap_uri = net.__resolve__(uri)
+            if remap_uri is None:
+                if not node.target_task is None:
+                    self.__tasks__.append((i, node.isWorking))
+                if not node.max_tokens_allowed is None:
+                    self.__limits__.append((i, node.isMaxLimitReached))
+            else:
+                self.__tasks__.append((i, lambda node=node, uri=remap_uri: node.isWorking(uri)))
+                self.__limits__.append((i, lambda node=node, uri=remap_uri: node.isMaxLimitReached(uri)))
+        self.publish()
+
+    @property
+    def name(self):
+        return self.__block__.name
+
+    @property
+    def places(self):
+        return list(self.__places__)
+
+    def close(self, unlink=True):
+        with self.__lock__:
+            if not self.__block__ is None:
+                self.__block__.close(unlink)
+                self.__block__ = None
+
+    def publish(self, min_interval=None):
+        now = time.perf_counter()
+        if not min_interval is None and now - self.__published__ < min_interval:
+            return False
+        with self.__lock__:
+            block = self.__block__
+            if block is None:
+                return False
+            if self.__net__.nplaces != len(self.__places__):
+                raise Exception("QNet <%s> structure changed, the shared marking must be recreated" % self.__net__.getLabel())
+            x = self.__net__.marking()
+            block.header['seq'] += 1
+            block.tokens[:] = x
+            for i, isWorking in self.__tasks__:
+                block.working[i] = isWorking()
+            for i, isMaxLimitReached in self.__limits__:
+                block.capacity[i] = isMaxLimitReached()
+            block.header['seq'] += 1
+            self.__published__ = now
+        return True
+
+class QSharedMarkingReader(object):
+
+    def __init__(self, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=False, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block with the resource
+            # tracker of this process, which would unlink it on exit. A block
+            # created here keeps the single registration of its writer.
+            shm = shared_memory.SharedMemory(name=name, create=False)
+            if os.name == 'posix' and not shm.name in __created__:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        if int(header['magic']) != MAGIC or int(header['version']) != VERSION:
+            shm.close()
+            raise Exception("Shared memory block <%s> does not hold a QNet marking" % name)
+        nplaces = int(header['nplaces'])
+        offset = __layout__(nplaces)[3]
+        uris = bytes(shm.buf[offset:offset + int(header['uris'])]).decode('utf-8')
+        del header
+        self.__places__ = uris.split('\n') if nplaces > 0 else []
+        self.__block__ = QSharedBlock(shm, nplaces, readonly=True)
+
+    @property
+    def places(self):
+        return list(self.__places__)
+
+    @property
+    def seq(self):
+        return self.__block__.seq
+
+    def close(self):
+        self.__block__.close()
+
+    def snapshot(self, retries=None):
+        block = self.__block__
+        n = 0
+        while retries is None or n < retries:
+            seq = block.seq
+            if seq % 2 == 0:
+                tokens = block.tokens.copy()
+                working = block.working.copy()
+                capacity = block.capacity.copy()
+                if block.seq == seq:
+                    return seq, tokens, working, capacity
+            n += 1
+            time.sleep(0)
+        raise Exception("Unable to read a consistent marking after %d retries" % retries)
+
+    def state(self):
+        _, tokens, _, _ = self.snapshot()
+        return ["%s=%d" % (uri, n) for uri, n in zip(self.__places__, tokens)]
+
+    def view(self):
+        return self.__block__.tokens, self.__block__.working, self.__block__.capacity
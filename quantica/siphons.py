@@ -0,0 +1,137 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Structural deadlock analysis of QNets. A siphon is a set of places whose
+producers all consume from it, so once empty it stays empty; a trap is a set of
+places whose consumers all produce into it, so once marked it stays marked.
+Minimal siphons and traps are enumerated by a branch and bound search that
+grows a set from its first place, adding one input place of each producer it
+still misses, and prunes every branch whose greatest siphon loses the places
+already chosen. By Commoner's theorem an ordinary net in which every minimal
+siphon contains an initially marked trap never deadlocks.
+"""
+
+import numpy as np
+
+def __bits__(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def __greatest__(A, relation, removed=None):
+    producers, followers = relation
+    stack = list(__bits__(A if removed is None else followers[removed] & A))
+    while len(stack) > 0:
+        p = stack.pop()
+        if A >> p & 1 and any(not pre & A for pre in producers[p]):
+            A &= ~(1 << p)
+            stack.extend(__bits__(followers[p] & A))
+    return A
+
+def __relation__(net, traps=False):
+    I, O = net.I > 0, net.O > 0
+    if traps:
+        I, O = O, I
+    producers = [[] for _ in range(I.shape[0])]
+    followers = [0] * I.shape[0]
+    for t in net.structure.live:
+        pre = np.flatnonzero(I[:, t]).tolist()
+        post = np.flatnonzero(O[:, t]).tolist()
+        for p in post:
+            producers[p].append(sum(1 << q for q in pre))
+        for q in pre:
+            followers[q] |= sum(1 << p for p in post)
+    return producers, followers
+
+def __minimal__(relation, limit=None):
+    producers = relation[0]
+    n = len(producers)
+    found = []
+    G = __greatest__((1 << n) - 1, relation)
+    for root in range(n):
+        if root > 0:
+            G = __greatest__(G & ~(1 << root - 1), relation, root - 1)
+        if not G >> root & 1:
+            continue
+        problems = [(1 << root, G)]
+        while len(problems) > 0:
+            S, A = problems.pop()
+            # Producers with a single candidate place extend the set without branching.
+            while True:
+                choices = None
+                for q in __bits__(S):
+                    for pre in producers[q]:
+                        if not pre & S and (choices is None or bin(pre & A).count('1') < bin(choices).count('1')):
+                            choices = pre & A
+                    if choices == 0:
+                        break
+                if choices is None or choices == 0 or (choices & (choices - 1)) != 0:
+                    break
+                S |= choices
+            if choices is None:
+                if all(__greatest__(S & ~(1 << q), relation) == 0 for q in __bits__(S)):
+                    found.append(S)
+                    if not limit is None and len(found) > limit:
+                        raise Exception("More than %d minimal sets found" % limit)
+                continue
+            # A set already containing a siphon only grows into a non minimal one.
+            if choices == 0 or __greatest__(S, relation) != 0:
+                continue
+            for q in __bits__(choices):
+                if A & S != S:
+                    break
+                if A >> q & 1:
+                    problems.append((S | 1 << q, A))
+                    A = __greatest__(A & ~(1 << q), relation, q)
+    return sorted(found, key=lambda S: (bin(S).count('1'), S))
+
+def __uris__(net, sets):
+    places = net.getPlacesURIs()
+    return [[places[p] for p in __bits__(S)] for S in sets]
+
+def emptiableSiphons(net, limit=None):
+    traps = __relation__(net, traps=True)
+    marked = sum(1 << p for p in np.flatnonzero(net.marking()).tolist())
+    return __uris__(net, [S for S in __minimal__(__relation__(net), limit) if not __greatest__(S, traps) & marked])
+
+def isDeadlockFree(net, limit=None):
+    if net.H.any() or net.R.any() or (net.I[:, net.structure.live] > 1).any():
+        raise Exception("QNet <%s> has weighted, inhibitor or reset arcs: the siphon check does not apply" % net.getLabel())
+    for uri in net.getPlacesURIs():
+        node, remap_uri = net.__resolve__(uri)
+        if remap_uri is None and not node.max_tokens_allowed is None:
+            raise Exception("Place <%s> has a capacity: the siphon check does not apply" % uri)
+    if len(net.structure.live) == 0:
+        return False
+    return len(emptiableSiphons(net, limit)) == 0
+
+def minimalSiphons(net, limit=None):
+    return __uris__(net, __minimal__(__relation__(net), limit))
+
+def minimalTraps(net, limit=None):
+    return __uris__(net, __minimal__(__relation__(net, traps=True), limit))
@@ -0,0 +1,293 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Symbolic reachability of 1-safe QNets. Sets of markings are reduced ordered
+binary decision diagrams over one variable per place, and the reachable set is
+the fixpoint of the transition images computed by chaining, so that nets whose
+independent branches multiply the number of markings are analysed without
+enumerating them.
+
+https://en.wikipedia.org/wiki/Binary_decision_diagram
+"""
+
+import numpy as np
+
+from quantica import bitset
+
+class QBDD(object):
+
+    def __init__(self, nvars):
+        self.__nvars__ = nvars
+        self.__var__ = [nvars, nvars]
+        self.__lo__ = [0, 1]
+        self.__hi__ = [0, 1]
+        self.__unique__ = {}
+        self.__cache__ = {}
+
+    @property
+    def nvars(self):
+        return self.__nvars__
+
+    def __apply__(self, op, u, v):
+        if op == 'and':
+            if u == 0 or v == 0:
+                return 0
+            if u == 1 or u == v:
+                return v
+            if v == 1:
+                return u
+        elif op == 'or':
+            if u == 1 or v == 1:
+                return 1
+            if u == 0 or u == v:
+                return v
+            if v == 0:
+                return u
+        else:
+            if u == 0 or v == 1 or u == v:
+                return 0
+            if v == 0:
+                return u
+        if op != 'diff' and u > v:
+            u, v = v, u
+        key = (op, u, v)
+        r = self.__cache__.get(key, None)
+        if r is None:
+            var = self.__var__
+            top = min(var[u], var[v])
+            u0, u1 = (self.__lo__[u], self.__hi__[u]) if var[u] == top else (u, u)
+            v0, v1 = (self.__lo__[v], self.__hi__[v]) if var[v] == top else (v, v)
+            r = self.node(top, self.__apply__(op, u0, v0), self.__apply__(op, u1, v1))
+            self.__cache__[key] = r
+        return r
+
+    def __exists__(self, u, variables, last):
+        if u < 2 or self.__var__[u] > last:
+            return u
+        key = ('exists', u, variables)
+        r = self.__cache__.get(key, None)
+        if r is None:
+            lo = self.__exists__(self.__lo__[u], variables, last)
+            hi = self.__exists__(self.__hi__[u], variables, last)
+            if self.__var__[u] in variables:
+                r = self.__apply__('or', lo, hi)
+            else:
+                r = self.node(self.__var__[u], lo, hi)
+            self.__cache__[key] = r
+        return r
+
+    def clear(self):
+        self.__cache__ = {}
+
+    def conj(self, u, v):
+        return self.__apply__('and', u, v)
+
+    def cube(self, literals):
+        u = 1
+        for var in sorted(literals.keys(), reverse=True):
+            u = self.node(var, 0, u) if literals[var] else self.node(var, u, 0)
+        return u
+
+    def diff(self, u, v):
+        return self.__apply__('diff', u, v)
+
+    def disj(self, u, v):
+        return self.__apply__('or', u, v)
+
+    def exists(self, u, variables):
+        variables = frozenset(variables)
+        if len(variables) == 0:
+            return u
+        return self.__exists__(u, variables, max(variables))
+
+    def node(self, var, lo, hi):
+        if lo == hi:
+            return lo
+        key = (var, lo, hi)
+        u = self.__unique__.get(key, None)
+        if u is None:
+            u = len(self.__var__)
+            self.__var__.append(var)
+            self.__lo__.append(lo)
+            self.__hi__.append(hi)
+            self.__unique__[key] = u
+        return u
+
+    def pick(self, u):
+        if u == 0:
+            return None
+        literals = {}
+        while u > 1:
+            if self.__lo__[u] != 0:
+                literals[self.__var__[u]] = False
+                u = self.__lo__[u]
+            else:
+                literals[self.__var__[u]] = True
+                u = self.__hi__[u]
+        return literals
+
+    def satcount(self, u):
+        counts = {0: 0, 1: 1}
+        var = self.__var__
+        stack = [u]
+        while len(stack) > 0:
+            w = stack[-1]
+            if w in counts:
+                stack.pop()
+                continue
+            lo, hi = self.__lo__[w], self.__hi__[w]
+            if lo in counts and hi in counts:
+                stack.pop()
+                counts[w] = counts[lo] * 2 ** (var[lo] - var[w] - 1) + counts[hi] * 2 ** (var[hi] - var[w] - 1)
+            else:
+                stack.extend((lo, hi))
+        return counts[u] * 2 ** var[u] if u > 1 else counts[u] * 2 ** self.__nvars__
+
+    def size(self, u):
+        seen = set()
+        stack = [u]
+        while len(stack) > 0:
+            w = stack.pop()
+            if w > 1 and not w in seen:
+                seen.add(w)
+                stack.extend((self.__lo__[w], self.__hi__[w]))
+        return len(seen)
+
+def order(net):
+    structure = net.structure
+    seen = [False] * net.nplaces
+    result = []
+    for root in range(net.nplaces):
+        stack = [root]
+        while len(stack) > 0:
+            p = stack.pop()
+            if seen[p]:
+                continue
+            seen[p] = True
+            result.append(p)
+            successors = []
+            for t in structure.consumers[p]:
+                successors.extend(q for q in structure.postset[t].tolist() if not seen[q])
+            stack.extend(reversed(successors))
+    return result
+
+class QSymbolicNet(object):
+
+    def __init__(self, net, places_order=None):
+        self.__places__ = net.getPlacesURIs()
+        self.__transitions__ = net.getTransitionsURIs()
+        self.__label__ = net.getLabel()
+        self.__order__ = order(net) if places_order is None else [self.__places__.index(uri) for uri in places_order]
+        self.__bdd__ = QBDD(len(self.__places__))
+        var = {p: v for v, p in enumerate(self.__order__)}
+        bits = lambda mask: [var[p] for p in range(len(self.__places__)) if mask >> p & 1]
+        self.__rules__ = []
+        for t, need, block, clear, post, unsafe in bitset.rules(net):
+            enable = dict([(v, False) for v in bits(block)] + [(v, True) for v in bits(need)])
+            result = dict([(v, False) for v in bits(clear)] + [(v, True) for v in bits(post)])
+            occupied = 1 if unsafe else 0
+            for v in bits(post & ~clear):
+                occupied = self.__bdd__.disj(occupied, self.__bdd__.cube({v: True}))
+            self.__rules__.append((t, self.__bdd__.cube(enable), occupied, frozenset(result.keys()),
+                                   self.__bdd__.cube(result)))
+        x = net.marking()
+        if (x > 1).any():
+            raise Exception("QNet <%s> is not 1-safe in its current marking" % self.__label__)
+        self.__initial__ = self.__bdd__.cube({var[p]: bool(x[p]) for p in range(len(self.__places__))})
+        self.__reachable__ = None
+        self.__iterations__ = 0
+
+    @property
+    def bdd(self):
+        return self.__bdd__
+
+    @property
+    def initial(self):
+        return self.__initial__
+
+    @property
+    def iterations(self):
+        return self.__iterations__
+
+    @property
+    def places(self):
+        return [self.__places__[p] for p in self.__order__]
+
+    def count(self, u=None):
+        return self.__bdd__.satcount(self.reachable() if u is None else u)
+
+    def deadlocks(self):
+        dead = self.reachable()
+        for _, enable, _, _, _ in self.__rules__:
+            dead = self.__bdd__.diff(dead, enable)
+        return dead
+
+    def decode(self, literals):
+        x = np.zeros(len(self.__places__), dtype=np.int64)
+        for v, value in literals.items():
+            x[self.__order__[v]] = int(value)
+        return x
+
+    def formatState(self, x):
+        return ["%s=%d" % (uri, tokens) for uri, tokens in zip(self.__places__, x)]
+
+    def image(self, u, rule):
+        t, enable, occupied, variables, result = rule
+        enabled = self.__bdd__.conj(u, enable)
+        if enabled == 0:
+            return 0
+        if occupied != 0 and self.__bdd__.conj(enabled, occupied) != 0:
+            raise Exception("Firing <%s> puts a second token in a place of QNet <%s>"
+                            % (self.__transitions__[t], self.__label__))
+        return self.__bdd__.conj(self.__bdd__.exists(enabled, variables), result)
+
+    def isDeadlockFree(self):
+        return self.deadlocks() == 0
+
+    def reachable(self):
+        if self.__reachable__ is None:
+            bdd = self.__bdd__
+            reached = self.__initial__
+            while True:
+                self.__iterations__ += 1
+                previous = reached
+                for rule in self.__rules__:
+                    reached = bdd.disj(reached, self.image(reached, rule))
+                bdd.clear()
+                if reached == previous:
+                    break
+            self.__reachable__ = reached
+        return self.__reachable__
+
+    def witness(self, u=None):
+        literals = self.__bdd__.pick(self.deadlocks() if u is None else u)
+        if literals is None:
+            return None
+        return self.decode(literals)
+
+def isDeadlockFree(net):
+    return QSymbolicNet(net).isDeadlockFree()
@@ -0,0 +1,206 @@
+"""
+BSD 2-Clause License
+
+Copyright (c) 2020, Davide De Tommaso (dtmdvd@gmail.com)
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+Execution traces of QNet runs. Every firing is appended as a fixed size
+(step, transition index, occurrences, timestamp) record to a preallocated NumPy
+ring buffer or to a memory-mapped file, and any marking of the run can be
+rebuilt from the initial marking and the columns of the incidence matrix.
+Tokens produced or consumed from outside the net are recorded as events on a
+virtual column past the transitions, `len(transitions) + place index`, whose
+count is the signed number of tokens.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+TRACE_FORMAT_VERSION = 1
+TRACE_DTYPE = np.dtype([('step', '<u8'), ('transition', '<u4'), ('count', '<i4'), ('timestamp', '<f8')])
+
+class QTrace(object):
+
+    def __init__(self, places, transitions, x0, C, capacity=65536, path=None):
+        self.__places__ = list(places)
+        self.__transitions__ = list(transitions)
+        self.__x0__ = np.array(x0, dtype=np.int64)
+        self.__C__ = np.array(C, dtype=np.int64).reshape(len(self.__places__), len(self.__transitions__))
+        self.__capacity__ = capacity
+        self.__path__ = path
+        self.__lock__ = threading.Lock()
+        self.__steps__ = 0
+        self.__first__ = 0
+        self.__base__ = self.__x0__.copy()
+        if path is None:
+            self.__records__ = np.zeros(capacity, dtype=TRACE_DTYPE)
+        else:
+            np.savez(path + '.npz', version=TRACE_FORMAT_VERSION, places=np.array(self.__places__, dtype=str),
+                     transitions=np.array(self.__transitions__, dtype=str), x0=self.__x0__, C=self.__C__)
+            with open(path, 'wb') as f:
+                f.truncate(capacity * TRACE_DTYPE.itemsize)
+            self.__records__ = np.memmap(path, dtype=TRACE_DTYPE, mode='r+', shape=(capacity,))
+
+    @classmethod
+    def fromNet(cls, net, capacity=65536, path=None):
+        return cls(net.getPlacesURIs(), net.getTransitionsURIs(), net.marking(), net.C, capacity=capacity, path=path)
+
+    @classmethod
+    def open(cls, path):
+        meta = np.load(path + '.npz')
+        trace = cls.__new__(cls)
+        trace.__places__ = [str(uri) for uri in meta['places']]
+        trace.__transitions__ = [str(uri) for uri in meta['transitions']]
+        trace.__x0__ = meta['x0']
+        trace.__C__ = meta['C']
+        trace.__path__ = path
+        trace.__lock__ = threading.Lock()
+        if int(meta['version']) != TRACE_FORMAT_VERSION:
+            raise Exception("Unsupported trace file version %d" % int(meta['version']))
+        if os.path.getsize(path) == 0:
+            records = np.zeros(0, dtype=TRACE_DTYPE)
+        else:
+            records = np.memmap(path, dtype=TRACE_DTYPE, mode='r')
+        trace.__steps__ = int(np.count_nonzero(records['timestamp']))
+        trace.__capacity__ = len(records)
+        trace.__records__ = records
+        trace.__first__ = 0
+        trace.__base__ = trace.__x0__.copy()
+        return trace
+
+    @property
+    def capacity(self):
+        return self.__capacity__
+
+    @property
+    def places(self):
+        return list(self.__places__)
+
+    @property
+    def transitions(self):
+        return list(self.__transitions__)
+
+    @property
+    def first(self):
+        return self.__first__
+
+    @property
+    def steps(self):
+        return self.__steps__
+
+    def __append__(self, index, count):
+        with self.__lock__:
+            if self.__steps__ - self.__first__ == self.__capacity__:
+                if self.__path__ is None:
+                    oldest = self.__records__[self.__first__ % self.__capacity__]
+                    self.__base__ += self.__column__(int(oldest['transition'])) * int(oldest['count'])
+                    self.__first__ += 1
+                else:
+                    self.__grow__()
+            record = self.__records__[self.__steps__ % self.__capacity__]
+            record['step'] = self.__steps__
+            record['transition'] = index
+            record['count'] = count
+            record['timestamp'] = time.time()
+            self.__steps__ += 1
+
+    def __column__(self, index):
+        if index < len(self.__transitions__):
+            return self.__C__[:, index]
+        column = np.zeros(len(self.__places__), dtype=np.int64)
+        column[index - len(self.__transitions__)] = 1
+        return column
+
+    def __grow__(self):
+        self.__records__.flush()
+        self.__capacity__ *= 2
+        with open(self.__path__, 'r+b') as f:
+            f.truncate(self.__capacity__ * TRACE_DTYPE.itemsize)
+        self.__records__ = np.memmap(self.__path__, dtype=TRACE_DTYPE, mode='r+', shape=(self.__capacity__,))
+
+    def close(self):
+        if not self.__path__ is None:
+            with self.__lock__:
+                self.__records__.flush()
+                del self.__records__
+                with open(self.__path__, 'r+b') as f:
+                    f.truncate(self.__steps__ * TRACE_DTYPE.itemsize)
+                self.__records__ = np.memmap(self.__path__, dtype=TRACE_DTYPE, mode='r') if self.__steps__ > 0 \
+                    else np.zeros(0, dtype=TRACE_DTYPE)
+
+    def flush(self):
+        if not self.__path__ is None:
+            self.__records__.flush()
+
+    def marking(self, step=None):
+        with self.__lock__:
+            if step is None:
+                step = self.__steps__
+            if step < self.__first__ or step > self.__steps__:
+                raise IndexError("Step %d is not available in the trace [%d, %d]" % (step, self.__first__, self.__steps__))
+            records = self.records(self.__first__, step)
+            ntransitions = len(self.__transitions__)
+            counts = np.bincount(records['transition'].astype(np.intp), weights=records['count'],
+                                 minlength=ntransitions + len(self.__places__)).astype(np.int64)
+            return self.__base__ + self.__C__.dot(counts[:ntransitions]) + counts[ntransitions:]
+
+    def record(self, t_index, count=1):
+        self.__append__(t_index, count)
+
+    def recordTokens(self, p_index, n):
+        self.__append__(len(self.__transitions__) + p_index, n)
+
+    def records(self, start=None, stop=None):
+        if start is None:
+            start = self.__first__
+        if stop is None:
+            stop = self.__steps__
+        start = max(start, self.__first__)
+        stop = min(stop, self.__steps__)
+        if stop <= start:
+            return np.zeros(0, dtype=TRACE_DTYPE)
+        i = start % self.__capacity__
+        j = i + (stop - start)
+        if j <= self.__capacity__:
+            return np.array(self.__records__[i:j])
+        return np.concatenate((self.__records__[i:], self.__records__[:j - self.__capacity__]))
+
+    def replay(self, start=None, stop=None):
+        if start is None:
+            start = self.__first__
+        x = self.marking(start).copy()
+        nodes = self.__transitions__ + self.__places__
+        for record in self.records(start, stop):
+            x += self.__column__(int(record['transition'])) * int(record['count'])
+            yield int(record['step']) + 1, nodes[record['transition']], x.copy()
+
+    def state(self, step=None):
+        x = self.marking(step)
+        return ["%s=%d" % (uri, tokens) for uri, tokens in zip(self.__places__, x)]
+
+    def transitionsIndices(self, start=None, stop=None):
+        return self.records(start, stop)['transition'].astype(np.intp)
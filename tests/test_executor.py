@@ -0,0 +1,60 @@
+import threading
+import time
+import unittest
+
+from quantica.core import QNet
+from quantica.executor import QTaskExecutor
+from quantica.models import QTimed
+
+class TestSaturatedExecutor(unittest.TestCase):
+
+    def test_queued_task_keeps_place_working(self):
+        release = threading.Event()
+        net = QNet('Saturated')
+        busy = net.createPlace('Busy', target_task=release.wait)
+        queued = net.createPlace('Queued', target_task=lambda: None)
+        net.setTaskExecutor(1)
+        net.produce(busy, 1)
+        net.produce(queued, 1)
+        self.assertTrue(net.isWorking(queued))
+        self.assertTrue(net.pendingTasks())
+        release.set()
+        while net.pendingTasks():
+            time.sleep(0.001)
+        self.assertFalse(net.isWorking(queued))
+
+    def test_timer_waits_for_its_task(self):
+        net = QNet('Timed')
+        timer = QTimed('Timer', 200)
+        net.addNet(timer)
+        X = net.createPlace('X', init_tokens=1)
+        Y = net.createPlace('Y')
+        busy = net.createPlace('Busy', target_task=lambda: time.sleep(0.2))
+        net.connect(X, timer.T_IN, 1)
+        net.connect(timer.T_OUT, Y, 1)
+        net.setTaskExecutor(1)
+        net.produce(busy, 1)
+        t0 = time.perf_counter()
+        runner = threading.Thread(target=net.start_async)
+        runner.start()
+        while net.getTokens(Y) == 0:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - t0
+        runner.join()
+        self.assertGreaterEqual(elapsed, 0.35)
+
+    def test_higher_priority_runs_first(self):
+        executor = QTaskExecutor(1)
+        release = threading.Event()
+        order = []
+        executor.submit(0, release.wait)
+        for priority in (0, 5, 1, 9):
+            executor.submit(priority, order.append, (priority,))
+        release.set()
+        while executor.pending() > 0:
+            time.sleep(0.001)
+        executor.shutdown()
+        self.assertEqual(order, [9, 5, 1, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import logging
+import unittest
+
+from quantica.core import QNet
+
+def bounded(bulk):
+    net = QNet('Bounded', logging_level=logging.WARNING)
+    a = net.createPlace('a', init_tokens=10)
+    b = net.createPlace('b', max_tokens_allowed=7)
+    t = net.createTransition('t')
+    net.connect(a, t, 2)
+    net.connect(t, b, 3)
+    net.setBulkFiring(bulk)
+    return net, t
+
+class TestCapacity(unittest.TestCase):
+
+    def test_single_and_bulk_firing_agree(self):
+        states = []
+        for bulk in (False, True):
+            net, t = bounded(bulk)
+            net.next_until_end()
+            self.assertEqual(net.getEnabledTransitions(), [])
+            self.assertFalse(net.isTransitionEnabled(t))
+            self.assertEqual(net.getEnablingDegree(t), 0)
+            self.assertFalse(net.fire(t))
+            states.append(net.state())
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(states[0], ['a.Bounded=6', 'b.Bounded=6'])
+
+    def test_degree_matches_enabling(self):
+        net, t = bounded(False)
+        self.assertTrue(net.isTransitionEnabled(t))
+        self.assertEqual(net.getEnablingDegree(t), 2)
+        self.assertEqual(net.fireMax(t), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import logging
+import unittest
+
+from quantica.core import QNet
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.net = QNet('Ingest', logging_level=logging.WARNING)
+        self.A = self.net.createPlace('A', colored=True)
+
+    def test_payloads_follow_their_tokens(self):
+        self.net.ingest([(self.A, 2), (self.A, 1, ['late'])])
+        self.net.__ingest__()
+        self.assertEqual(self.net.getTokens(self.A), 3)
+        self.assertEqual(self.net.getPayloads(self.A), [None, None, 'late'])
+
+    def test_short_payloads_are_padded(self):
+        self.net.ingest([(self.A, 2, ['a']), (self.A, 1, ['b'])])
+        self.net.__ingest__()
+        self.assertEqual(self.net.getPayloads(self.A), ['a', None, 'b'])
+
+    def test_rejects_empty_events(self):
+        for count in (0, -1):
+            with self.assertRaises(Exception):
+                self.net.ingest([(self.A, count)])
+        self.assertEqual(self.net.getTokens(self.A), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import logging
+import unittest
+
+from quantica.core import QNet
+from quantica.partition import QPartitionedNet
+
+def bounded_chain(n=20, tokens=50, bounded=10):
+    net = QNet('Chain', logging_level=logging.WARNING)
+    with net.batch():
+        places = [net.createPlace('P%d' % i, init_tokens=tokens if i == 0 else 0,
+                                  max_tokens_allowed=1 if i == bounded else None) for i in range(n)]
+        never = net.createPlace('Never')
+        for i in range(n - 1):
+            t = net.createTransition('T%d' % i)
+            net.connect(places[i], t, 1)
+            net.connect(t, places[i + 1], 1)
+        net.connect(never, 'T%d.Chain' % bounded, 1)
+    return net
+
+class TestPartitionedNet(unittest.TestCase):
+
+    def test_capacity_matches_sequential(self):
+        sequential = bounded_chain()
+        sequential.start_async()
+        expected = sequential.state()
+        for nprocs in (5, 6):
+            net = bounded_chain()
+            QPartitionedNet(net, nprocs=nprocs).start_async(timeout=60)
+            self.assertEqual(net.state(), expected)
+            self.assertEqual(net.getTokens('P10.Chain'), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from quantica import pnml
+
+EMPTY = """<?xml version="1.0" encoding="UTF-8"?>
+<pnml xmlns="http://www.pnml.org/version-2009/grammar/pnml">
+  <net id="n1" type="http://www.pnml.org/version-2009/grammar/ptnet"><page id="p"/></net>
+</pnml>
+"""
+
+class TestPNML(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_unnamed_empty_net(self):
+        path = os.path.join(self.dir, 'empty.pnml')
+        with open(path, 'w') as f:
+            f.write(EMPTY)
+        net = pnml.load(path, logging_level=logging.WARNING)
+        self.assertEqual(net.getLabel(), 'n1')
+        self.assertEqual(net.nplaces, 0)
+        self.assertEqual(net.ntransitions, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from quantica.core import ARC_INHIBITOR, ARC_RESET, QNet
+
+def sample():
+    net = QNet('Saved', logging_level=logging.WARNING)
+    P0 = net.createPlace('P0', init_tokens=3, max_tokens_allowed=5, priority=2)
+    P1 = net.createPlace('P1', batched=True, batch_size=4, linger_ms=2.5)
+    P2 = net.createPlace('P2', init_tokens=1, colored=True)
+    P3 = net.createPlace('P3')
+    T0 = net.createTransition('T0', priority=7)
+    T1 = net.createTransition('T1')
+    net.connect(P0, T0, 2)
+    net.connect(T0, P1, 3)
+    net.connect(P3, T0, 1, ARC_INHIBITOR)
+    net.connect(P2, T1, 1)
+    net.connect(P1, T1, 1, ARC_RESET)
+    net.connect(T1, P3, 1)
+    net.fire(T0)
+    return net
+
+class TestSaveLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def roundtrip(self, net, name):
+        path = os.path.join(self.dir, name)
+        net.save(path)
+        return QNet.load(path, logging_level=logging.WARNING)
+
+    def test_roundtrip(self):
+        net = sample()
+        loaded = self.roundtrip(net, 'net')
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'net.npz')))
+        self.assertEqual(loaded.getLabel(), net.getLabel())
+        self.assertEqual(loaded.state(), net.state())
+        self.assertEqual(sorted(loaded.getWeights()), sorted(net.getWeights()))
+        self.assertEqual(sorted(loaded.getKinds()), sorted(net.getKinds()))
+        for uri in net.getPlacesURIs():
+            place, other = net.getNode(uri), loaded.getNode(uri)
+            for name in ('init_tokens', 'max_tokens_allowed', 'batched', 'batch_size', 'linger_ms', 'colored',
+                         'priority'):
+                self.assertEqual(getattr(other, name), getattr(place, name), (uri, name))
+        for uri in net.getTransitionsURIs():
+            self.assertEqual(loaded.getPriority(uri), net.getPriority(uri))
+        self.assertEqual(loaded.getPayloads('P2.Saved'), [None])
+
+    def test_roundtrip_with_extension(self):
+        loaded = self.roundtrip(sample(), 'net.npz')
+        self.assertEqual(loaded.nplaces, 4)
+
+    def test_empty_net(self):
+        loaded = self.roundtrip(QNet('Empty', logging_level=logging.WARNING), 'empty')
+        self.assertEqual(loaded.nplaces, 0)
+        self.assertEqual(loaded.ntransitions, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAME_PROCESS = """
+import logging
+from quantica.core import QNet
+from quantica.sharedmem import QSharedMarkingReader
+
+net = QNet('Shared', logging_level=logging.WARNING)
+net.createPlace('P', init_tokens=1)
+shared = net.shareMarking()
+reader = QSharedMarkingReader(shared.name)
+print(reader.state())
+reader.close()
+net.unshareMarking()
+"""
+
+class TestSharedMarking(unittest.TestCase):
+
+    def test_reader_in_writer_process(self):
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        result = subprocess.run([sys.executable, '-c', SAME_PROCESS], env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True, timeout=60)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "['P.Shared=1']")
+        self.assertEqual(result.stderr, '')
+
+if __name__ == '__main__':
+    unittest.main()